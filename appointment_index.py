@@ -0,0 +1,119 @@
+import datetime
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+
+class AppointmentIndex:
+    """Date-sorted, month-partitioned view over an appointments frame.
+
+    Rows are sorted once by appointment date so a date range is two binary
+    searches and a positional slice. Spend, visits and unique clients are
+    precomputed per month, so only the partial months at the edges of a
+    range are ever scanned.
+    """
+
+    def __init__(self, df: pd.DataFrame, date_col: str = 'Appointment date',
+                 cost_col: str = 'Cost', client_col: str = 'identifier'):
+        self.date_col = date_col
+        if date_col in df.columns:
+            df = df[df[date_col].notna()]
+        if df.empty or date_col not in df.columns:
+            self.df = df
+            self._dates = np.array([], dtype='datetime64[ns]')
+            self._starts = np.array([0])
+            self.months = np.array([], dtype='datetime64[M]')
+            self._costs = np.array([], dtype=float)
+            self._clients = None
+            self._month_spend = self._month_visits = np.array([])
+            self._month_clients = []
+            return
+
+        if not df[date_col].is_monotonic_increasing:
+            df = df.iloc[np.argsort(df[date_col].to_numpy(), kind='stable')]
+        self.df = df
+
+        self._dates = df[date_col].to_numpy(dtype='datetime64[ns]')
+        self._costs = (pd.to_numeric(df[cost_col], errors='coerce').fillna(0).to_numpy(dtype=float)
+                       if cost_col in df.columns else np.zeros(len(df)))
+
+        # Partition boundaries: first row of each month, plus the end
+        self.months, starts = np.unique(self._dates.astype('datetime64[M]'), return_index=True)
+        self._starts = np.append(starts, len(df))
+
+        # Per-month aggregates
+        self._month_spend = np.add.reduceat(self._costs, starts)
+        self._month_visits = np.diff(self._starts)
+        if client_col in df.columns:
+            codes, uniques = pd.factorize(df[client_col].astype(object), use_na_sentinel=False)
+            self._clients = (codes, np.asarray(uniques, dtype=object))
+            self._month_clients = [np.unique(codes[s:e]) for s, e in zip(self._starts[:-1], self._starts[1:])]
+        else:
+            self._clients = None
+            self._month_clients = []
+
+    def __len__(self):
+        return len(self.df)
+
+    @property
+    def empty(self) -> bool:
+        return len(self.df) == 0
+
+    @property
+    def min_date(self) -> Optional[datetime.date]:
+        return pd.Timestamp(self._dates[0]).date() if len(self._dates) else None
+
+    @property
+    def max_date(self) -> Optional[datetime.date]:
+        return pd.Timestamp(self._dates[-1]).date() if len(self._dates) else None
+
+    def _bounds(self, start_date=None, end_date=None):
+        """Row positions [lo, hi) covering start_date..end_date inclusive."""
+        lo, hi = 0, len(self._dates)
+        if start_date:
+            lo = int(np.searchsorted(self._dates, np.datetime64(pd.Timestamp(start_date).normalize()), 'left'))
+        if end_date:
+            day_after = pd.Timestamp(end_date).normalize() + pd.Timedelta(days=1)
+            hi = int(np.searchsorted(self._dates, np.datetime64(day_after), 'left'))
+        return lo, max(lo, hi)
+
+    def slice(self, start_date=None, end_date=None) -> pd.DataFrame:
+        """Appointments between start_date and end_date (inclusive), in date order."""
+        lo, hi = self._bounds(start_date, end_date)
+        return self.df.iloc[lo:hi]
+
+    def summary(self, start_date=None, end_date=None, resolve: Optional[dict] = None) -> dict:
+        """Spend, visits and unique clients for a date range.
+
+        `resolve` optionally maps a client identifier to its master id, so
+        identifiers linked to the same master count once.
+        """
+        lo, hi = self._bounds(start_date, end_date)
+        # Whole partitions p..q-1 lie inside [lo, hi)
+        p = int(np.searchsorted(self._starts, lo, 'left'))
+        q = int(np.searchsorted(self._starts, hi, 'right')) - 1
+        if q > p:
+            edges = [(lo, int(self._starts[p])), (int(self._starts[q]), hi)]
+            spend = float(self._month_spend[p:q].sum())
+            visits = int(self._month_visits[p:q].sum())
+        else:
+            edges = [(lo, hi)]
+            spend, visits = 0.0, 0
+        for s, e in edges:
+            spend += float(self._costs[s:e].sum())
+            visits += e - s
+
+        unique_clients = None
+        if self._clients is not None:
+            codes, values = self._clients
+            parts = [codes[s:e] for s, e in edges]
+            if q > p:
+                parts.extend(self._month_clients[p:q])
+            idents = values[np.unique(np.concatenate(parts))] if parts else values[:0]
+            if resolve:
+                idents = pd.Series(idents, dtype=object)
+                idents = idents.map(resolve).fillna(idents)
+            unique_clients = int(pd.Series(idents, dtype=object).nunique())
+
+        return {'spend': spend, 'visits': visits, 'unique_clients': unique_clients}
@@ -0,0 +1,132 @@
+import os
+from typing import Iterable, Iterator, List, Optional
+
+import pandas as pd
+
+# Rows per chunk when streaming an export
+CHUNK_SIZE = 50_000
+
+SUPPORTED_TYPES = ["xlsx", "csv", "parquet"]
+
+DATE_COLUMN = "Appointment date"
+COST_COLUMN = "Cost"
+STATUS_COLUMN = "Status"
+
+
+def _file_type(source) -> str:
+    name = getattr(source, "name", source if isinstance(source, str) else "")
+    ext = os.path.splitext(str(name))[1].lower().lstrip(".")
+    if ext not in SUPPORTED_TYPES:
+        raise ValueError(f"Unsupported file type '{ext}' (expected one of: {', '.join(SUPPORTED_TYPES)})")
+    return ext
+
+
+def _wanted(columns: Iterable[str], status: Optional[str]) -> List[str]:
+    wanted = list(dict.fromkeys(columns))
+    if status is not None and STATUS_COLUMN not in wanted:
+        wanted.append(STATUS_COLUMN)
+    return wanted
+
+
+def _filter_status(chunk: pd.DataFrame, status: Optional[str]) -> pd.DataFrame:
+    if status is None:
+        return chunk
+    if STATUS_COLUMN not in chunk.columns:
+        raise ValueError(f"Missing column '{STATUS_COLUMN}'")
+    return chunk[chunk[STATUS_COLUMN] == status]
+
+
+def _iter_csv(source, wanted: List[str], status: Optional[str]) -> Iterator[pd.DataFrame]:
+    reader = pd.read_csv(
+        source,
+        usecols=lambda c: c.strip() in wanted,
+        dtype=str,
+        chunksize=CHUNK_SIZE,
+    )
+    for chunk in reader:
+        chunk.columns = [c.strip() for c in chunk.columns]
+        yield _filter_status(chunk, status)
+
+
+def _iter_parquet(source, wanted: List[str], status: Optional[str]) -> Iterator[pd.DataFrame]:
+    import pyarrow.parquet as pq
+
+    pf = pq.ParquetFile(source)
+    names = {n.strip(): n for n in pf.schema_arrow.names}
+    cols = [names[c] for c in wanted if c in names]
+    for batch in pf.iter_batches(batch_size=CHUNK_SIZE, columns=cols):
+        chunk = batch.to_pandas()
+        chunk.columns = [c.strip() for c in chunk.columns]
+        yield _filter_status(chunk, status)
+
+
+def _iter_xlsx(source, wanted: List[str], status: Optional[str]) -> Iterator[pd.DataFrame]:
+    from openpyxl import load_workbook
+
+    # read_only streams rows instead of building the whole sheet in memory
+    wb = load_workbook(source, read_only=True, data_only=True)
+    try:
+        rows = wb.worksheets[0].iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        positions = [(i, str(h).strip()) for i, h in enumerate(header)
+                     if h is not None and str(h).strip() in wanted]
+        names = [name for _, name in positions]
+        status_pos = next((i for i, name in positions if name == STATUS_COLUMN), None)
+        if status is not None and status_pos is None:
+            raise ValueError(f"Missing column '{STATUS_COLUMN}'")
+
+        buffer = []
+        for row in rows:
+            if status is not None and (status_pos >= len(row) or row[status_pos] != status):
+                continue
+            buffer.append([row[i] if i < len(row) else None for i, _ in positions])
+            if len(buffer) >= CHUNK_SIZE:
+                yield pd.DataFrame(buffer, columns=names)
+                buffer = []
+        if buffer:
+            yield pd.DataFrame(buffer, columns=names)
+    finally:
+        wb.close()
+
+
+_READERS = {"csv": _iter_csv, "parquet": _iter_parquet, "xlsx": _iter_xlsx}
+
+
+def read_appointments(source, columns: Iterable[str], required: Iterable[str] = (),
+                      status: Optional[str] = None) -> pd.DataFrame:
+    """Read an appointments export (xlsx, csv or parquet).
+
+    Only `columns` are read, in chunks, and rows whose Status differs from
+    `status` are dropped while reading. Headers are stripped, missing
+    optional columns are added empty, "Appointment date" is parsed to a
+    naive datetime and "Cost" to float; other columns stay text.
+    """
+    wanted = _wanted(columns, status)
+    chunks = list(_READERS[_file_type(source)](source, wanted, status))
+    df = pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame(columns=wanted)
+
+    missing = [c for c in required if c not in df.columns]
+    if missing:
+        raise ValueError(f"Missing column(s): {', '.join(missing)}")
+    for col in wanted:
+        if col not in df.columns:
+            df[col] = None
+
+    for col in wanted:
+        if col == DATE_COLUMN:
+            dates = pd.to_datetime(df[col], errors="coerce")
+            # The format is inferred from the first value; re-parse stragglers one by one
+            retry = dates.isna() & df[col].notna()
+            if retry.any():
+                dates[retry] = pd.to_datetime(df.loc[retry, col], errors="coerce", format="mixed")
+            if getattr(dates.dt, "tz", None) is not None:
+                dates = dates.dt.tz_localize(None)
+            df[col] = dates
+        elif col == COST_COLUMN:
+            df[col] = pd.to_numeric(df[col], errors="coerce").fillna(0).astype("float64")
+        else:
+            # Keep NaN as NaN so fillna-based fallbacks still work
+            df[col] = df[col].where(df[col].isna(), df[col].astype(str)).astype(object)
+    return df[wanted]
@@ -0,0 +1,201 @@
+import random
+import threading
+import time
+from collections import deque
+from typing import Dict, List
+
+try:
+    import httpx
+except ImportError:  # only used to recognise transient network errors
+    httpx = None
+
+# Builder methods that make a query a write (never retried or coalesced)
+WRITE_METHODS = {"insert", "upsert", "update", "delete"}
+
+DEFAULT_TIMEOUT = 10.0  # seconds, per HTTP call
+DEFAULT_RETRIES = 3
+BACKOFF_BASE = 0.2  # seconds
+BACKOFF_MAX = 2.0
+STATS_SAMPLES = 500  # latencies kept per endpoint
+
+
+def create_transport(url: str, key: str, timeout: float = DEFAULT_TIMEOUT, **kwargs) -> "BackendTransport":
+    """Create the Supabase client with a per-call timeout and wrap it.
+
+    The client keeps one pooled keep-alive HTTP session; create this once
+    per process (st.cache_resource) so every session shares the pool.
+    """
+    from supabase import create_client
+    try:
+        from supabase import ClientOptions
+        client = create_client(url, key, options=ClientOptions(postgrest_client_timeout=timeout))
+    except ImportError:
+        client = create_client(url, key)
+    return BackendTransport(client, **kwargs)
+
+
+def _http_status(value):
+    """An HTTP status from an int or a 3-digit string; Postgres SQLSTATEs (5 chars) are not."""
+    if isinstance(value, int):
+        return value
+    if isinstance(value, str) and len(value) == 3 and value.isdigit():
+        return int(value)
+    return None
+
+
+def _is_transient(error: Exception) -> bool:
+    if isinstance(error, (TimeoutError, ConnectionError)):
+        return True
+    if httpx is not None and isinstance(error, (httpx.TransportError, httpx.TimeoutException)):
+        return True
+    # httpx errors carry .response; postgrest's APIError carries the status as a string .code
+    for value in (getattr(getattr(error, "response", None), "status_code", None), getattr(error, "code", None)):
+        status = _http_status(value)
+        if status is not None and (500 <= status < 600 or status == 429):
+            return True
+    return False
+
+
+class _InFlight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class _EndpointStats:
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.retries = 0
+        self.coalesced = 0
+        self.latencies = deque(maxlen=STATS_SAMPLES)
+
+
+class QueryProxy:
+    """Records a table query chain; execute() hands it to the transport."""
+
+    def __init__(self, transport: "BackendTransport", table: str, chain=()):
+        self._transport = transport
+        self._table = table
+        self._chain = chain
+
+    def __getattr__(self, name):
+        def step(*args, **kwargs):
+            return QueryProxy(self._transport, self._table, self._chain + ((name, args, kwargs),))
+        return step
+
+    def execute(self):
+        return self._transport.execute(self._table, self._chain)
+
+
+class BackendTransport:
+    """Timeout-bounded, retrying, coalescing layer under all table calls.
+
+    Reads are retried on transient errors with jittered exponential
+    backoff, and identical reads already in flight (from any session) wait
+    for that one request instead of issuing their own. A read only joins a
+    flight started after the latest write to its table completed, so a
+    reload after write-then-invalidate never gets pre-write rows. Writes go
+    through once. Per-endpoint latency statistics are kept for diagnosis.
+    """
+
+    def __init__(self, client, retries: int = DEFAULT_RETRIES,
+                 backoff_base: float = BACKOFF_BASE, backoff_max: float = BACKOFF_MAX):
+        self.client = client
+        self.retries = retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._lock = threading.Lock()
+        self._in_flight: Dict[tuple, _InFlight] = {}
+        self._writes: Dict[str, int] = {}
+        self._stats: Dict[str, _EndpointStats] = {}
+
+    def table(self, name: str) -> QueryProxy:
+        return QueryProxy(self, name)
+
+    def _endpoint_stats(self, endpoint: str) -> _EndpointStats:
+        with self._lock:
+            return self._stats.setdefault(endpoint, _EndpointStats())
+
+    def _send(self, table, chain):
+        query = self.client.table(table)
+        for name, args, kwargs in chain:
+            query = getattr(query, name)(*args, **kwargs)
+        return query.execute()
+
+    def _timed_send(self, endpoint, table, chain, retry):
+        stats = self._endpoint_stats(endpoint)
+        attempt = 0
+        while True:
+            started = time.perf_counter()
+            try:
+                result = self._send(table, chain)
+            except Exception as e:
+                with self._lock:
+                    stats.calls += 1
+                    stats.errors += 1
+                    stats.latencies.append((time.perf_counter() - started) * 1000)
+                if not retry or attempt >= self.retries or not _is_transient(e):
+                    raise
+                attempt += 1
+                with self._lock:
+                    stats.retries += 1
+                # Full jitter keeps retrying sessions from stampeding together
+                time.sleep(random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt)))
+                continue
+            with self._lock:
+                stats.calls += 1
+                stats.latencies.append((time.perf_counter() - started) * 1000)
+            return result
+
+    def execute(self, table: str, chain: tuple):
+        writes = [name for name, _, _ in chain if name in WRITE_METHODS]
+        endpoint = f"{table}.{writes[0] if writes else 'select'}"
+        if writes:
+            try:
+                return self._timed_send(endpoint, table, chain, retry=False)
+            finally:
+                # Even a failed write may have landed; reads from now on start fresh
+                with self._lock:
+                    self._writes[table] = self._writes.get(table, 0) + 1
+
+        with self._lock:
+            key = (table, self._writes.get(table, 0), repr(chain))
+            flight = self._in_flight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._in_flight[key] = _InFlight()
+            else:
+                self._stats.setdefault(endpoint, _EndpointStats()).coalesced += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            flight.result = self._timed_send(endpoint, table, chain, retry=True)
+            return flight.result
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+            flight.done.set()
+
+    def stats(self) -> List[dict]:
+        """Per-endpoint call counts and latency percentiles (ms)."""
+        rows = []
+        with self._lock:
+            items = [(name, s.calls, s.errors, s.retries, s.coalesced, sorted(s.latencies))
+                     for name, s in self._stats.items()]
+        for name, calls, errors, retries, coalesced, lat in sorted(items):
+            pick = (lambda q: round(lat[min(len(lat) - 1, int(q * len(lat)))], 1)) if lat else (lambda q: None)
+            rows.append({
+                "Endpoint": name, "Calls": calls, "Errors": errors, "Retries": retries,
+                "Coalesced": coalesced, "p50 ms": pick(0.5), "p95 ms": pick(0.95), "max ms": pick(1.0),
+            })
+        return rows
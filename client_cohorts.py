@@ -0,0 +1,120 @@
+import threading
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from appointment_index import AppointmentIndex
+
+
+def month_numbers(dates: pd.Series) -> pd.Series:
+    """Months since year 0 (year * 12 + month - 1), so offsets are plain subtraction."""
+    return dates.dt.year * 12 + dates.dt.month - 1
+
+
+def month_label(number: int) -> str:
+    return f"{number // 12:04d}-{number % 12 + 1:02d}"
+
+
+def monthly_aggregates(df: pd.DataFrame) -> pd.DataFrame:
+    """Per identifier per month spend and visits from appointment rows."""
+    if df.empty:
+        return pd.DataFrame({'identifier': pd.Series(dtype=object), 'month': pd.Series(dtype='int64'),
+                             'spend': pd.Series(dtype=float), 'visits': pd.Series(dtype='int64')})
+    agg = df.groupby([df['identifier'], month_numbers(df['Appointment date']).rename('month')], observed=True).agg(
+        spend=('Cost', 'sum'),
+        visits=('Cost', 'size'),
+    ).reset_index()
+    agg['identifier'] = agg['identifier'].astype(object)
+    return agg
+
+
+class CohortStore:
+    """Per identifier monthly aggregates, kept in sync with the appointment index.
+
+    The first sync builds everything from the index. After our own publish
+    (mark_dirty, then the loader reports the reloaded index through
+    note_load), only the dirty months are recomputed from that index; any
+    other index (TTL reload, possibly carrying other writers' changes)
+    triggers a full rebuild.
+    """
+
+    def __init__(self):
+        self.monthly: Optional[pd.DataFrame] = None
+        self._source = None
+        self._dirty = set()
+        self._awaiting_reload = False
+        self._incremental_source = None
+        self._lock = threading.Lock()
+
+    def mark_dirty(self, months: Iterable[int]):
+        """Record the months our own write touched; the next load is ours."""
+        with self._lock:
+            self._dirty.update(int(m) for m in months)
+            self._awaiting_reload = True
+
+    def note_load(self, index: AppointmentIndex):
+        """Called by the appointment loader for every freshly built index."""
+        with self._lock:
+            self._incremental_source = index if self._awaiting_reload else None
+            self._awaiting_reload = False
+
+    def sync(self, index: AppointmentIndex) -> pd.DataFrame:
+        with self._lock:
+            if self.monthly is not None and index is self._source:
+                return self.monthly
+            if self.monthly is None or not self._dirty or index is not self._incremental_source:
+                self.monthly = monthly_aggregates(index.df)
+            else:
+                parts = [self.monthly[~self.monthly['month'].isin(self._dirty)]]
+                for m in sorted(self._dirty):
+                    start = pd.Timestamp(year=m // 12, month=m % 12 + 1, day=1)
+                    end = start + pd.offsets.MonthEnd(0)
+                    parts.append(monthly_aggregates(index.slice(start, end)))
+                self.monthly = pd.concat(parts, ignore_index=True)
+            self._dirty.clear()
+            self._incremental_source = None
+            self._source = index
+            return self.monthly
+
+
+def cohort_matrices(monthly: pd.DataFrame, links: Dict, masters: Dict,
+                    tag_filter: Optional[List[str]] = None) -> Dict[str, pd.DataFrame]:
+    """Cohort (first booking month) x month offset matrices.
+
+    Identifiers are resolved to master clients through `links`. With
+    `tag_filter`, only master clients carrying one of the tags are kept.
+    Returns 'clients' (active clients), 'retention' (% of cohort size) and
+    'revenue' (spend), each indexed by cohort label with integer offset columns.
+    """
+    m = monthly.copy()
+    m['client'] = m['identifier'].map(links).fillna(m['identifier'])
+    m = m.groupby(['client', 'month'], as_index=False)['spend'].sum()
+
+    if tag_filter:
+        wanted = set(tag_filter)
+        tagged = {mid for mid, master in masters.items() if wanted.intersection(master.get('tags') or [])}
+        m = m[m['client'].isin(tagged)]
+
+    if m.empty:
+        empty = pd.DataFrame()
+        return {'clients': empty, 'retention': empty, 'revenue': empty}
+
+    m = m.assign(cohort=m.groupby('client')['month'].transform('min'))
+    m = m.assign(offset=m['month'] - m['cohort'])
+
+    # Every offset gets a column, even months where no cohort was active
+    offsets = range(int(m['offset'].max()) + 1)
+    clients = m.pivot_table(index='cohort', columns='offset', values='client', aggfunc='count').reindex(columns=offsets).fillna(0)
+    revenue = m.pivot_table(index='cohort', columns='offset', values='spend', aggfunc='sum').reindex(columns=offsets).fillna(0)
+    retention = clients.div(clients[0], axis=0) * 100
+
+    # Offsets beyond the latest month have not happened yet: leave them blank
+    future = np.add.outer(clients.index.to_numpy(), clients.columns.to_numpy()) > int(m['month'].max())
+    clients, retention, revenue = (frame.mask(future) for frame in (clients, retention, revenue))
+
+    labels = [month_label(c) for c in clients.index]
+    for frame in (clients, retention, revenue):
+        frame.index = labels
+        frame.index.name = 'Cohort'
+    return {'clients': clients, 'retention': retention, 'revenue': revenue}
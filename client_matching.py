@@ -0,0 +1,145 @@
+import re
+import unicodedata
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+
+# Blocks larger than this (very common names, shared office phones) are
+# skipped: comparing inside them is quadratic and rarely meaningful.
+MAX_BLOCK_SIZE = 50
+MIN_CONFIDENCE = 0.6
+
+# Noisy-OR evidence weights: P(duplicate) contributed by each signal
+PHONE_WEIGHT = 0.85
+EMAIL_WEIGHT = 0.75        # same local part at the same domain
+# Same local part at another domain ("info@", "contact@" are shared by many
+# businesses): weak on its own, below MIN_CONFIDENCE without other support
+EMAIL_LOCAL_WEIGHT = 0.3
+NAME_WEIGHT = 0.8      # scaled by name trigram similarity
+PHONETIC_WEIGHT = 0.3
+
+_SOUNDEX_CODES = {c: str(d) for d, letters in enumerate(
+    ["aeiouyhw", "bfpv", "cgjkqsxz", "dt", "l", "mn", "r"]) for c in letters}
+
+
+def _ascii_lower(text) -> str:
+    if not isinstance(text, str):
+        return ""
+    text = unicodedata.normalize("NFKD", text)
+    return text.encode("ascii", "ignore").decode("ascii").lower()
+
+
+def name_tokens(name) -> list:
+    return re.findall(r"[a-z]+", _ascii_lower(name))
+
+
+def soundex(token: str) -> str:
+    if not token:
+        return ""
+    digits = [_SOUNDEX_CODES.get(c, "0") for c in token]
+    out, prev = [], digits[0]
+    for c, d in zip(token[1:], digits[1:]):
+        if d != "0" and d != prev:
+            out.append(d)
+        if c not in "hw":
+            prev = d
+    return (token[0] + "".join(out) + "000")[:4]
+
+
+def _trigrams(tokens) -> frozenset:
+    text = f"  {' '.join(tokens)} "
+    return frozenset(text[i:i + 3] for i in range(len(text) - 2))
+
+
+def identifier_profiles(df: pd.DataFrame) -> pd.DataFrame:
+    """One row per identifier with its blocking keys.
+
+    Expects appointment rows with 'identifier', 'Customer name', 'Email' and 'Phone'.
+    """
+    cols = {'Customer name': 'name', 'Email': 'email', 'Phone': 'phone'}
+    rows = df[['identifier'] + [c for c in cols if c in df.columns]]
+    profiles = rows.astype(object).groupby('identifier').first().rename(columns=cols)
+    for col in cols.values():
+        if col not in profiles.columns:
+            profiles[col] = None
+
+    digits = profiles['phone'].astype(str).str.replace(r"\D", "", regex=True)
+    profiles['phone_key'] = digits.str[-10:].where(digits.str.len() >= 7, "")
+
+    email = profiles['email'].where(profiles['email'].astype(str).str.contains("@", na=False), "").astype(str).str.lower()
+    local = email.str.split("@").str[0].str.split("+").str[0].str.replace(".", "", regex=False)
+    profiles['email_key'] = local.where(local.str.len() >= 3, "")
+    profiles['email_domain'] = email.str.split("@").str[1].fillna("")
+
+    tokens = [name_tokens(n) for n in profiles['name']]
+    profiles['name_key'] = [" ".join(sorted(t)) for t in tokens]
+    profiles['phonetic_key'] = [f"{soundex(t[0])}-{soundex(t[-1])}" if len(t) >= 2 else "" for t in tokens]
+    profiles['trigrams'] = [_trigrams(t) for t in tokens]
+    return profiles
+
+
+def candidate_pairs(profiles: pd.DataFrame) -> pd.DataFrame:
+    """Pairs of identifiers sharing at least one blocking key (a < b)."""
+    keys = []
+    for key in ('phone_key', 'email_key', 'name_key', 'phonetic_key'):
+        k = profiles[key]
+        k = k[k != ""]
+        keys.append(pd.DataFrame({'identifier': k.index, 'block': key + ":" + k.to_numpy()}))
+    keys = pd.concat(keys, ignore_index=True)
+
+    sizes = keys.groupby('block')['identifier'].transform('size')
+    keys = keys[(sizes > 1) & (sizes <= MAX_BLOCK_SIZE)]
+    pairs = keys.merge(keys, on='block', suffixes=('_a', '_b'))
+    pairs = pairs[pairs['identifier_a'].astype(str) < pairs['identifier_b'].astype(str)]
+    return pairs[['identifier_a', 'identifier_b']].drop_duplicates(ignore_index=True)
+
+
+def score_pairs(pairs: pd.DataFrame, profiles: pd.DataFrame) -> pd.DataFrame:
+    """Add a 0..1 confidence (noisy-OR of the matching signals) and a reason."""
+    a = profiles.loc[pairs['identifier_a']].reset_index(drop=True)
+    b = profiles.loc[pairs['identifier_b']].reset_index(drop=True)
+
+    same_phone = (a['phone_key'] != "") & (a['phone_key'] == b['phone_key'])
+    same_local = (a['email_key'] != "") & (a['email_key'] == b['email_key'])
+    same_email = same_local & (a['email_domain'] == b['email_domain'])
+    local_only = same_local & ~same_email
+    same_phonetic = (a['phonetic_key'] != "") & (a['phonetic_key'] == b['phonetic_key'])
+    name_sim = np.array([len(x & y) / len(x | y) if (x and y) else 0.0
+                         for x, y in zip(a['trigrams'], b['trigrams'])])
+
+    miss = ((1 - PHONE_WEIGHT * same_phone.to_numpy())
+            * (1 - EMAIL_WEIGHT * same_email.to_numpy())
+            * (1 - EMAIL_LOCAL_WEIGHT * local_only.to_numpy())
+            * (1 - NAME_WEIGHT * name_sim)
+            * (1 - PHONETIC_WEIGHT * same_phonetic.to_numpy()))
+
+    reasons = np.where(same_phone, "phone", "")
+    reasons = np.char.add(reasons, np.where(same_email, " email", np.where(local_only, " email-user", "")))
+    reasons = np.char.add(reasons, np.where(name_sim >= 0.5, " name", np.where(same_phonetic, " sounds-alike", "")))
+
+    out = pairs.reset_index(drop=True).copy()
+    out['name_a'] = a['name'].to_numpy()
+    out['name_b'] = b['name'].to_numpy()
+    out['confidence'] = 1 - miss
+    out['reason'] = [r.strip().replace(" ", ", ") for r in reasons]
+    return out
+
+
+def suggest_merges(df: pd.DataFrame, links: Dict, min_confidence: float = MIN_CONFIDENCE) -> pd.DataFrame:
+    """Likely duplicate identifiers, most confident first.
+
+    Pairs already linked to the same master client are left out.
+    """
+    profiles = identifier_profiles(df)
+    pairs = candidate_pairs(profiles)
+    if pairs.empty:
+        return pd.DataFrame(columns=['identifier_a', 'name_a', 'identifier_b', 'name_b', 'confidence', 'reason'])
+
+    scored = score_pairs(pairs, profiles)
+    master_a = scored['identifier_a'].map(links)
+    master_b = scored['identifier_b'].map(links)
+    already = master_a.notna() & (master_a == master_b)
+    scored = scored[~already & (scored['confidence'] >= min_confidence)]
+    return scored.sort_values('confidence', ascending=False, ignore_index=True)[
+        ['identifier_a', 'name_a', 'identifier_b', 'name_b', 'confidence', 'reason']]
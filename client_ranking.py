@@ -0,0 +1,26 @@
+from typing import Iterable
+
+import pandas as pd
+
+
+def filter_clients(client_stats: pd.DataFrame, search: str = "", tags: Iterable[str] = ()) -> pd.DataFrame:
+    """Clients whose name contains `search` (case-insensitive) and who carry any of `tags`."""
+    ranked = client_stats
+    if search:
+        ranked = ranked[ranked['Client Name'].astype(str).str.contains(search, case=False, na=False, regex=False)]
+    wanted_tags = set(tags)
+    if wanted_tags:
+        # A row mask, so an empty frame still keeps its columns
+        ranked = ranked[ranked['Tags'].map(lambda t: bool(wanted_tags.intersection(t or []))).astype(bool)]
+    return ranked
+
+
+def page_count(n_rows: int, page_size: int) -> int:
+    return max(1, -(-n_rows // page_size))
+
+
+def ranking_page(ranked: pd.DataFrame, page: int, page_size: int) -> pd.DataFrame:
+    """Rows of the 1-based `page` when ranked by Total Spent, highest first."""
+    first = (page - 1) * page_size
+    # Partial ordering: only the top page * page_size rows are ranked
+    return ranked.nlargest(first + page_size, 'Total Spent').iloc[first:]
@@ -0,0 +1,171 @@
+from typing import Dict, Iterable
+
+import numpy as np
+import pandas as pd
+
+from client_matching import name_tokens
+
+# Key of the per-employee rows stored in each daily report record
+EMPLOYEE_STATS = "Employee Stats"
+FACT_COLUMNS = ["Date", "Employee", "Heures payées", "CA ($)", "Jobs"]
+
+# Payroll sheets are one per employee ("1. Jane Doe"), header on row 6
+PAYROLL_HEADER_ROW = 5
+PAYROLL_HOURS_COLUMNS = ["Total hours", "Length (hours & minutes)"]
+
+TEAM_MEMBER = "Team member"
+# Jobs done by several people list them together; revenue is split evenly
+TEAM_SEPARATORS = r"\s*[,;&/+]\s*"
+
+
+def employee_name(sheet_name: str) -> str:
+    """Payroll sheet name without its "1. " prefix."""
+    return sheet_name.split('.', 1)[-1].strip() if '.' in sheet_name else sheet_name
+
+
+def _payroll_dates(raw: pd.Series) -> pd.Series:
+    if pd.api.types.is_datetime64_any_dtype(raw):
+        return raw.dt.normalize()
+    if pd.api.types.is_numeric_dtype(raw):
+        return pd.to_datetime(raw, unit='D', origin='1899-12-30', errors='coerce')
+    # Mixed column: Excel serial numbers next to dates or date strings
+    serial = raw.map(lambda v: isinstance(v, (int, float)) and not isinstance(v, bool) and not pd.isna(v))
+    dates = pd.to_datetime(raw.where(~serial), errors='coerce', format='mixed')
+    if serial.any():
+        dates[serial] = pd.to_datetime(raw[serial].astype(float), unit='D', origin='1899-12-30')
+    return dates.dt.normalize()
+
+
+def _payroll_hours(df: pd.DataFrame) -> pd.Series:
+    col = next((c for c in PAYROLL_HOURS_COLUMNS if c in df.columns), None)
+    if col is None:
+        return pd.Series(0.0, index=df.index)
+    raw = df[col]
+    hours = pd.to_numeric(raw, errors='coerce')
+    # "7h 30m" style durations
+    parts = raw.astype(str).str.extract(r"^\s*(\d+)\s*h\s*(\d*)")
+    minutes = pd.to_numeric(parts[1], errors='coerce').fillna(0)
+    return hours.fillna(pd.to_numeric(parts[0], errors='coerce') + minutes / 60)
+
+
+def read_payroll(source) -> pd.DataFrame:
+    """Worked hours per payroll line: Employee, Date (datetime.date), Hours > 0."""
+    xl = pd.ExcelFile(source)
+    frames = []
+    for sheet_name in xl.sheet_names:
+        if not sheet_name[:1].isdigit():
+            continue
+        df = xl.parse(sheet_name, header=PAYROLL_HEADER_ROW)
+        if "Start date" not in df.columns:
+            continue
+        frames.append(pd.DataFrame({
+            "Employee": employee_name(sheet_name),
+            "Date": _payroll_dates(df["Start date"]),
+            "Hours": _payroll_hours(df).astype(float),
+        }))
+    if not frames:
+        return pd.DataFrame({"Employee": pd.Series(dtype=object), "Date": pd.Series(dtype=object),
+                             "Hours": pd.Series(dtype=float)})
+    payroll = pd.concat(frames, ignore_index=True)
+    payroll = payroll[payroll["Date"].notna() & (payroll["Hours"] > 0)]
+    return payroll.assign(Date=payroll["Date"].dt.date).reset_index(drop=True)
+
+
+def match_team_members(members: Iterable[str], employees: Iterable[str]) -> Dict[str, str]:
+    """Map appointment team member names to payroll employee names.
+
+    Tried in order: same name tokens in any order ("Doe Jane"); then by
+    first name, where a multi-word member's last token must be an initial or
+    prefix of the employee's last name ("Jane D.", "Jane Do"), unless the
+    payroll name is a first name alone ("Jane"). The looser rules only match
+    when a single employee fits them. Unmatched members are left out.
+    """
+    employees = list(dict.fromkeys(employees))
+    tokens = {e: name_tokens(e) for e in employees}
+    exact = {}
+    by_first = {}
+    for e, t in tokens.items():
+        if t:
+            exact.setdefault(" ".join(sorted(t)), []).append(e)
+            by_first.setdefault(t[0], []).append(e)
+
+    matched = {}
+    for member in dict.fromkeys(members):
+        t = name_tokens(member)
+        if not t:
+            continue
+        candidates = exact.get(" ".join(sorted(t)), [])
+        if not candidates:
+            same_first = by_first.get(t[0], [])
+            if len(t) == 1:
+                candidates = same_first
+            else:
+                # "Jane Smith" must not fall back to the only Jane Doe on payroll,
+                # but fits a payroll sheet named just "Jane"
+                candidates = [e for e in same_first
+                              if len(tokens[e]) == 1 or tokens[e][-1].startswith(t[-1])]
+        if len(candidates) == 1:
+            matched[member] = candidates[0]
+    return matched
+
+
+def employee_day_fact(payroll: pd.DataFrame, appointments: pd.DataFrame) -> pd.DataFrame:
+    """Per employee per day paid hours, attributed revenue and jobs.
+
+    `payroll` comes from read_payroll; `appointments` has Date, Cost and
+    Team member. Team members are resolved to payroll names; those without a
+    payroll sheet keep their own name (and zero hours) so revenue still adds up.
+    """
+    hours = payroll.groupby(["Employee", "Date"], as_index=False)["Hours"].sum()
+
+    if TEAM_MEMBER in appointments.columns:
+        jobs = appointments[["Date", "Cost", TEAM_MEMBER]].dropna(subset=[TEAM_MEMBER])
+    else:
+        jobs = pd.DataFrame(columns=["Date", "Cost", TEAM_MEMBER])
+    jobs = jobs.assign(member=jobs[TEAM_MEMBER].astype(str).str.split(TEAM_SEPARATORS)).explode("member")
+    jobs = jobs[jobs["member"].notna() & (jobs["member"].str.strip() != "")]
+    jobs = jobs.assign(member=jobs["member"].str.strip())
+    share = jobs.groupby(level=0)["member"].transform("size")
+
+    matched = match_team_members(jobs["member"].unique(), hours["Employee"].unique())
+    jobs = jobs.assign(
+        Employee=jobs["member"].map(matched).fillna(jobs["member"]),
+        CA=jobs["Cost"].astype(float) / share,
+    )
+    revenue = jobs.groupby(["Employee", "Date"], as_index=False).agg(CA=("CA", "sum"), Jobs=("CA", "size"))
+
+    fact = hours.merge(revenue, on=["Employee", "Date"], how="outer")
+    fact = fact.fillna({"Hours": 0.0, "CA": 0.0, "Jobs": 0})
+    fact = fact.rename(columns={"Hours": "Heures payées", "CA": "CA ($)"})
+    fact["Jobs"] = fact["Jobs"].astype(int)
+    fact["Heures payées"] = fact["Heures payées"].round(2)
+    fact["CA ($)"] = fact["CA ($)"].round(2)
+    return fact.sort_values(["Date", "Employee"], ignore_index=True)[FACT_COLUMNS]
+
+
+def stats_by_day(fact: pd.DataFrame) -> Dict:
+    """Fact rows grouped per day, as stored in each daily report record."""
+    cols = [c for c in FACT_COLUMNS if c != "Date"]
+    return {d: g[cols].to_dict("records") for d, g in fact.groupby("Date")}
+
+
+def employee_fact(daily: pd.DataFrame) -> pd.DataFrame:
+    """Rebuild the per employee per day fact from a report's daily records."""
+    if EMPLOYEE_STATS not in daily.columns:
+        return pd.DataFrame(columns=FACT_COLUMNS)
+    rows = daily[["Date", EMPLOYEE_STATS]].explode(EMPLOYEE_STATS)
+    rows = rows[rows[EMPLOYEE_STATS].map(lambda r: isinstance(r, dict))]
+    if rows.empty:
+        return pd.DataFrame(columns=FACT_COLUMNS)
+    fact = pd.DataFrame(rows[EMPLOYEE_STATS].tolist())
+    fact.insert(0, "Date", rows["Date"].to_numpy())
+    return fact[FACT_COLUMNS]
+
+
+def employee_leaderboard(fact: pd.DataFrame, by=("Employee",)) -> pd.DataFrame:
+    """Hours, revenue, jobs and MPI ($/h) summed per employee (and any extra `by` keys)."""
+    board = fact.groupby(list(by), as_index=False)[["Heures payées", "CA ($)", "Jobs"]].sum()
+    hours = board["Heures payées"].to_numpy(dtype=float)
+    board["MPI ($/h)"] = np.divide(board["CA ($)"].to_numpy(dtype=float), hours,
+                                   out=np.zeros(len(board)), where=hours > 0).round(2)
+    return board.sort_values("MPI ($/h)", ascending=False, ignore_index=True)
@@ -0,0 +1,454 @@
+"""Concurrent-session load test for both dashboards.
+
+Drives N simulated viewers of client_dashboard.py and myle_mpi_dashboard.py
+through Streamlit's AppTest API, against an in-memory stand-in for the
+Supabase tables with configurable latency, and reports rerun latency
+percentiles, backend call counts and peak memory per concurrency level.
+Each level runs in its own Python process, so caches start cold and the
+peak RSS figure belongs to that level alone.
+
+    python load_test.py --levels 1,5,10,20 --latency-ms 40
+"""
+import argparse
+import datetime
+import json
+import logging
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+import types
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+CLIENT_APP = os.path.join(HERE, "client_dashboard.py")
+MPI_APP = os.path.join(HERE, "myle_mpi_dashboard.py")
+
+
+# ──────────────────────
+# In-memory Supabase stand-in
+# ──────────────────────
+class FakeResponse:
+    def __init__(self, data):
+        self.data = data
+
+
+class FakeQuery:
+    """Supports the subset of the PostgREST builder the dashboards use."""
+
+    def __init__(self, backend, table):
+        self.backend = backend
+        self.table = table
+        self.op = "select"
+        self.columns = None
+        self.payload = None
+        self.on_conflict = None
+        self.filters = []
+        self.bounds = None
+        self.order_by = None
+
+    def select(self, columns="*", **_):
+        self.columns = None if columns.strip() == "*" else [c.strip() for c in columns.split(",")]
+        return self
+
+    def insert(self, payload, **_):
+        self.op, self.payload = "insert", payload
+        return self
+
+    def upsert(self, payload, on_conflict="", **_):
+        self.op, self.payload, self.on_conflict = "upsert", payload, on_conflict
+        return self
+
+    def update(self, payload, **_):
+        self.op, self.payload = "update", payload
+        return self
+
+    def delete(self, **_):
+        self.op = "delete"
+        return self
+
+    def eq(self, column, value):
+        self.filters.append((column, value))
+        return self
+
+    def range(self, start, end):
+        self.bounds = (start, end)
+        return self
+
+    def order(self, column, desc=False, **_):
+        self.order_by = (column, desc)
+        return self
+
+    def execute(self):
+        return self.backend.execute(self)
+
+
+class FakeClient:
+    def __init__(self, backend):
+        self.backend = backend
+
+    def table(self, name):
+        return FakeQuery(self.backend, name)
+
+
+class FakeBackend:
+    """Thread-safe in-memory tables with per-call latency and call counting."""
+
+    def __init__(self, latency_ms=40.0, jitter_ms=10.0):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.tables = {}
+        self.calls = Counter()
+        self._lock = threading.Lock()
+
+    def reset_counts(self):
+        with self._lock:
+            self.calls.clear()
+
+    def _match(self, row, filters):
+        return all(str(row.get(c)) == str(v) for c, v in filters)
+
+    def execute(self, q):
+        time.sleep(max(0.0, self.latency_ms + random.uniform(-self.jitter_ms, self.jitter_ms)) / 1000)
+        now = datetime.datetime.now(datetime.timezone.utc).isoformat()
+        with self._lock:
+            self.calls[f"{q.table}.{q.op}"] += 1
+            rows = self.tables.setdefault(q.table, [])
+            if q.op == "select":
+                out = [r for r in rows if self._match(r, q.filters)]
+                if q.order_by:
+                    out.sort(key=lambda r: r.get(q.order_by[0]) or "", reverse=q.order_by[1])
+                if q.bounds:
+                    out = out[q.bounds[0]:q.bounds[1] + 1]
+                if q.columns:
+                    out = [{c: r.get(c) for c in q.columns} for r in out]
+                return FakeResponse([dict(r) for r in out])
+            if q.op == "insert":
+                payload = q.payload if isinstance(q.payload, list) else [q.payload]
+                added = [{"id": str(uuid.uuid4()), "created_at": now, "updated_at": now, **p} for p in payload]
+                rows.extend(added)
+                return FakeResponse([dict(r) for r in added])
+            if q.op == "upsert":
+                payload = q.payload if isinstance(q.payload, list) else [q.payload]
+                keys = [k.strip() for k in (q.on_conflict or "id").split(",")]
+                out = []
+                for p in payload:
+                    existing = next((r for r in rows if all(str(r.get(k)) == str(p.get(k)) for k in keys)), None)
+                    if existing is None:
+                        existing = {"id": str(uuid.uuid4()), "created_at": now}
+                        rows.append(existing)
+                    existing.update(p, updated_at=now)
+                    out.append(dict(existing))
+                return FakeResponse(out)
+            if q.op == "update":
+                out = []
+                for r in rows:
+                    if self._match(r, q.filters):
+                        r.update(q.payload, updated_at=now)
+                        out.append(dict(r))
+                return FakeResponse(out)
+            if q.op == "delete":
+                kept = [r for r in rows if not self._match(r, q.filters)]
+                removed = len(rows) - len(kept)
+                self.tables[q.table] = kept
+                return FakeResponse([{}] * removed)
+        raise ValueError(f"Unsupported operation {q.op}")
+
+
+def install_fake_supabase(backend):
+    """Make `from supabase import create_client` return a client on `backend`."""
+    module = types.ModuleType("supabase")
+    module.Client = FakeClient
+    module.create_client = lambda url, key, *a, **k: FakeClient(backend)
+    sys.modules["supabase"] = module
+
+
+# ──────────────────────
+# Seed data
+# ──────────────────────
+def seed(backend, n_appointments, n_clients, n_weeks, rng):
+    first = ["John", "Mary", "Ahmed", "Li", "Sarah", "Pierre", "Jose", "Anna", "Omar", "Chloe"]
+    idents = [f"client{i}@example.com" for i in range(n_clients)]
+    names = [f"{first[i % len(first)]} Client{i}" for i in range(n_clients)]
+    start = datetime.datetime(2024, 1, 1)
+    team = ["Angela", "Mariana", "Nanette", "Sam"]
+
+    picks = rng.integers(0, n_clients, n_appointments)
+    offsets = rng.integers(0, 540 * 24, n_appointments)
+    backend.tables["dashboard_appointments"] = [{
+        "booking_id": f"B{i}",
+        "appointment_date": (start + datetime.timedelta(hours=int(h))).isoformat(),
+        "cost": round(float(rng.uniform(60, 400)), 2),
+        "customer_name": names[c],
+        "email": idents[c],
+        "phone": f"514{c:07d}",
+        "service_type": "Cleaning",
+        "team_member": team[i % len(team)],
+        "identifier": idents[c],
+        "created_at": start.isoformat(),
+    } for i, (c, h) in enumerate(zip(picks, offsets))]
+
+    masters = [{"id": str(uuid.uuid4()), "name": names[i], "tags": ["VIP"] if i % 10 == 0 else []}
+               for i in range(0, n_clients, 5)]
+    backend.tables["master_clients"] = masters
+    backend.tables["client_links"] = [{"id": str(uuid.uuid4()), "identifier": idents[i * 5], "master_client_id": m["id"]}
+                                      for i, m in enumerate(masters)]
+
+    reports = []
+    for w in range(n_weeks):
+        monday = start + datetime.timedelta(weeks=w)
+        days = []
+        for d in range(6):
+            ca = float(rng.uniform(1500, 4000))
+            hours = float(rng.uniform(40, 80))
+            days.append({
+                "Date": int(pd.Timestamp(monday + datetime.timedelta(days=d)).value // 10**6),
+                "CA ($)": round(ca, 2), "Heures payées": round(hours, 2), "MPI ($/h)": round(ca / hours, 2),
+                "Jobs": int(rng.integers(5, 20)), "Employees": 4,
+                "Employees List": team, "Clients List": names[:5], "Tier": "🟢 Good",
+                "Employee Stats": [{"Employee": e, "Heures payées": round(hours / len(team), 2),
+                                    "CA ($)": round(ca / len(team), 2), "Jobs": 3} for e in team],
+            })
+        reports.append({
+            "id": str(uuid.uuid4()),
+            "start_date": monday.date().isoformat(),
+            "end_date": (monday + datetime.timedelta(days=5)).date().isoformat(),
+            "report_data": days,
+            "created_at": monday.isoformat(),
+            "updated_at": monday.isoformat(),
+        })
+    backend.tables["mpi_reports"] = reports
+
+
+def share_apptest_runtime():
+    """Let concurrent AppTest sessions behave like sessions of one server.
+
+    AppTest expects one test at a time. Each run() installs a mock Runtime
+    singleton and clears it when done, so a session that finishes pulls the
+    runtime from under the others (their page comes back empty). Each run
+    also compiles the script afresh, and CPython 3.11's AST conversion is not
+    thread-safe ("AST constructor recursion depth mismatch"). Keep serving the
+    last runtime installed, and compile each script once under a lock, as a
+    server's script cache does.
+    """
+    from streamlit.runtime import Runtime
+    from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+
+    last = []
+
+    def instance(cls):
+        if cls._instance is not None:
+            last[:] = [cls._instance]
+            return cls._instance
+        if last:
+            return last[0]
+        raise RuntimeError("Runtime hasn't been created!")
+
+    Runtime.instance = classmethod(instance)
+    Runtime.exists = classmethod(lambda cls: cls._instance is not None or bool(last))
+
+    compiled, lock = {}, threading.Lock()
+    get_bytecode = ScriptCache.get_bytecode
+
+    def shared_bytecode(self, script_path):
+        with lock:
+            if script_path not in compiled:
+                compiled[script_path] = get_bytecode(self, script_path)
+            return compiled[script_path]
+
+    ScriptCache.get_bytecode = shared_bytecode
+
+
+# ──────────────────────
+# Session scripts
+# ──────────────────────
+def timed_run(at, latencies):
+    started = time.perf_counter()
+    at.run()
+    latencies.append((time.perf_counter() - started) * 1000)
+    if at.exception:
+        raise RuntimeError(at.exception[0].message)
+
+
+def client_session(backend, timeout, latencies):
+    """Employee opens the ranking, narrows the date range, then an admin edit lands."""
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(CLIENT_APP, default_timeout=timeout)
+    timed_run(at, latencies)
+
+    date_input = at.sidebar.date_input[0]
+    lo, hi = date_input.value
+    quarter = (hi - lo) // 4
+    date_input.set_value((lo + quarter, hi - quarter))
+    timed_run(at, latencies)
+
+    # A write through the app: link an identifier with the merge tool, which
+    # goes through link_identifier, the backend transport and
+    # invalidate_client_data. (Tag edits live in an st.data_editor, which
+    # AppTest cannot drive.)
+    ident = next(s for s in at.selectbox if s.label == "Identifier to Link")
+    ident.select_index(random.randrange(len(ident.options)))
+    next(b for b in at.button if b.label == "Link Identifier").click()
+    timed_run(at, latencies)
+
+
+def mpi_session(backend, timeout, latencies):
+    """Viewer opens a shared ?id= report, then compares periods in Global Overview."""
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(MPI_APP, default_timeout=timeout)
+    at.query_params["id"] = random.choice(backend.tables["mpi_reports"])["id"]
+    timed_run(at, latencies)
+
+    at.sidebar.radio[0].set_value("Global Overview")
+    timed_run(at, latencies)
+
+    periods = at.multiselect[0]
+    periods.set_value(list(periods.options)[:10])
+    timed_run(at, latencies)
+
+
+SCENARIOS = {"client": client_session, "mpi": mpi_session}
+
+
+def peak_rss_mb():
+    """Peak resident memory of this process in MB (None where unsupported, e.g. Windows)."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KB, macOS reports bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def run_level(backend, scenario, sessions, timeout, trace_memory):
+    """Run one concurrency level; meant to be the only level in its process."""
+    import streamlit as st
+
+    st.cache_data.clear()
+    st.cache_resource.clear()
+    backend.reset_counts()
+    if trace_memory:
+        tracemalloc.start()
+
+    latencies, errors = [], []
+    lock = threading.Lock()
+
+    def one_session(_):
+        mine = []
+        try:
+            SCENARIOS[scenario](backend, timeout, mine)
+        except Exception as e:
+            with lock:
+                errors.append(f"{type(e).__name__}: {e}")
+        with lock:
+            latencies.extend(mine)
+
+    started = time.perf_counter()
+    # Opened reports are also cached on disk: keep that tier cold, and out of the app's own directory
+    with tempfile.TemporaryDirectory(prefix="mpi_report_cache_") as cache_dir:
+        os.environ["MPI_REPORT_CACHE_DIR"] = cache_dir
+        with ThreadPoolExecutor(max_workers=sessions) as pool:
+            list(pool.map(one_session, range(sessions)))
+    wall = time.perf_counter() - started
+
+    traced_peak = None
+    if trace_memory:
+        traced_peak = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+        tracemalloc.stop()
+
+    lat = np.array(latencies) if latencies else np.array([np.nan])
+    return {
+        "app": scenario,
+        "sessions": sessions,
+        "reruns": len(latencies),
+        "errors": len(errors),
+        "p50 ms": float(np.percentile(lat, 50)),
+        "p95 ms": float(np.percentile(lat, 95)),
+        "p99 ms": float(np.percentile(lat, 99)),
+        "wall s": wall,
+        "backend calls": sum(backend.calls.values()),
+        "calls by endpoint": dict(backend.calls),
+        # Process high-water mark; the process runs only this level
+        "peak RSS MB": peak_rss_mb(),
+        "traced peak MB": traced_peak,
+        "first error": errors[0] if errors else "",
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--app", choices=["client", "mpi", "both"], default="both")
+    parser.add_argument("--levels", default="1,5,10,20", help="comma-separated concurrent session counts")
+    parser.add_argument("--latency-ms", type=float, default=40.0, help="simulated backend latency per call")
+    parser.add_argument("--jitter-ms", type=float, default=10.0)
+    parser.add_argument("--appointments", type=int, default=20000)
+    parser.add_argument("--clients", type=int, default=3000)
+    parser.add_argument("--weeks", type=int, default=40)
+    parser.add_argument("--timeout", type=float, default=120.0, help="per-rerun timeout in seconds")
+    parser.add_argument("--trace-memory", action="store_true",
+                        help="also report tracemalloc peak per level (slows reruns)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--one-level", metavar="APP:SESSIONS", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.one_level:
+        # Child process: run a single level and hand the result back as JSON
+        for name in ("streamlit.deprecation_util", "streamlit.runtime.scriptrunner_utils.script_run_context"):
+            logging.getLogger(name).disabled = True
+        app, sessions = args.one_level.split(":")
+        random.seed(args.seed)
+        backend = FakeBackend(args.latency_ms, args.jitter_ms)
+        seed(backend, args.appointments, args.clients, args.weeks, np.random.default_rng(args.seed))
+        install_fake_supabase(backend)
+        share_apptest_runtime()
+        res = run_level(backend, app, int(sessions), args.timeout, args.trace_memory)
+        print("RESULT " + json.dumps(res))
+        return
+
+    apps = ["client", "mpi"] if args.app == "both" else [args.app]
+    levels = [int(x) for x in args.levels.split(",") if x.strip()]
+    common = [f"--latency-ms={args.latency_ms}", f"--jitter-ms={args.jitter_ms}",
+              f"--appointments={args.appointments}", f"--clients={args.clients}", f"--weeks={args.weeks}",
+              f"--timeout={args.timeout}", f"--seed={args.seed}"] + (["--trace-memory"] if args.trace_memory else [])
+    results = []
+    for app in apps:
+        for sessions in levels:
+            # A fresh process per level: cold caches and a per-level memory peak
+            proc = subprocess.run([sys.executable, os.path.abspath(__file__), f"--one-level={app}:{sessions}"] + common,
+                                  capture_output=True, text=True)
+            lines = [l for l in proc.stdout.splitlines() if l.startswith("RESULT ")]
+            if not lines:
+                print(f"{app:>6} x{sessions:<3} failed:\n{proc.stderr[-2000:]}", flush=True)
+                continue
+            res = json.loads(lines[-1][len("RESULT "):])
+            results.append(res)
+            print(f"{app:>6} x{sessions:<3} p50={res['p50 ms']:.0f}ms p95={res['p95 ms']:.0f}ms "
+                  f"p99={res['p99 ms']:.0f}ms calls={res['backend calls']} errors={res['errors']}", flush=True)
+
+    if not results:
+        return
+    table = pd.DataFrame(results)
+    pd.set_option("display.width", 200)
+    print()
+    print(table.drop(columns=["calls by endpoint", "first error"]).round(1).to_string(index=False))
+    print()
+    for res in results:
+        print(f"{res['app']} x{res['sessions']}: {res['calls by endpoint']}")
+        if res["first error"]:
+            print(f"  first error: {res['first error']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+from typing import Callable, List, Optional
+
+REPORTS_TABLE = "mpi_reports"
+REPORT_UPSERT_CHUNK = 200
+# Postgres: no unique constraint matching the ON CONFLICT columns
+MISSING_CONSTRAINT_CODE = "42P10"
+
+
+def report_record(start_date, end_date, df_json) -> dict:
+    return {
+        "start_date": start_date.isoformat(),
+        "end_date": end_date.isoformat(),
+        "report_data": df_json
+    }
+
+
+def missing_period_constraint(error: Exception) -> bool:
+    return getattr(error, "code", None) == MISSING_CONSTRAINT_CODE or "ON CONFLICT specification" in str(error)
+
+
+def save_report_record(client, record: dict):
+    """Look the week up, then update or insert (used until the constraint exists)."""
+    existing = client.table(REPORTS_TABLE).select("id").eq("start_date", record["start_date"]).eq("end_date", record["end_date"]).execute()
+    if existing.data:
+        report_id = existing.data[0]['id']
+        client.table(REPORTS_TABLE).update(record).eq("id", report_id).execute()
+        return report_id
+    response = client.table(REPORTS_TABLE).insert(record).execute()
+    return response.data[0]['id'] if response.data else None
+
+
+def save_reports(client, reports, on_fallback: Optional[Callable[[], None]] = None) -> List:
+    """Persist many weeks at once; reports is a list of (start_date, end_date, df_json).
+
+    One upsert per REPORT_UPSERT_CHUNK weeks, keyed on (start_date, end_date);
+    if a week appears twice the last one wins. A chunk rejected for lack of
+    the period constraint is saved week by week instead, after calling
+    `on_fallback`. Returns the report ids in input order (None where nothing
+    came back).
+    """
+    if not reports:
+        return []
+    records = [report_record(*rep) for rep in reports]
+    # Postgres rejects an upsert that touches the same row twice
+    unique = list({(r["start_date"], r["end_date"]): r for r in records}.values())
+    ids_by_period = {}
+    for i in range(0, len(unique), REPORT_UPSERT_CHUNK):
+        chunk = unique[i:i + REPORT_UPSERT_CHUNK]
+        try:
+            # Insert or overwrite atomically; no select-then-write race between admins
+            response = client.table(REPORTS_TABLE).upsert(chunk, on_conflict="start_date,end_date").execute()
+            rows = response.data or []
+        except Exception as e:
+            if not missing_period_constraint(e):
+                raise
+            if on_fallback is not None:
+                on_fallback()
+            rows = [{"start_date": r["start_date"], "end_date": r["end_date"], "id": save_report_record(client, r)}
+                    for r in chunk]
+        for row in rows:
+            ids_by_period[(row['start_date'], row['end_date'])] = row['id']
+    return [ids_by_period.get((r["start_date"], r["end_date"])) for r in records]
@@ -5,7 +5,15 @@ import plotly.graph_objects as go
 from datetime import datetime
 import io
 import json
-from supabase import create_client, Client
+import os
+import time
+
+from appointments_import import SUPPORTED_TYPES, read_appointments
+from backend_transport import create_transport
+from employee_mpi import EMPLOYEE_STATS, employee_day_fact, employee_fact, employee_leaderboard, read_payroll, stats_by_day
+from mpi_reports import save_reports
+from report_cache import ReportCache
+from rerun_timing import record_timing, show_timings, timed
 
 # ──────────────────────
 # Configuration Supabase
@@ -16,13 +24,42 @@ SUPABASE_KEY = "eyJhbGciOiJIUzI1NiIsInR5cCI6IkpXVCJ9.eyJpc3MiOiJzdXBhYmFzZSIsInJ
 @st.cache_resource
 def init_supabase():
     try:
-        return create_client(SUPABASE_URL, SUPABASE_KEY)
+        # Pooled keep-alive client with per-call timeouts, read retries and coalescing
+        return create_transport(SUPABASE_URL, SUPABASE_KEY)
     except Exception as e:
         st.error(f"Erreur de connexion Supabase: {e}")
         return None
 
 supabase = init_supabase()
 
+# Opened reports are cached by id and validated against mpi_reports.updated_at.
+# Setup (once, in the Supabase SQL Editor):
+#   ALTER TABLE mpi_reports ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW();
+#   CREATE OR REPLACE FUNCTION set_updated_at() RETURNS trigger AS $$
+#   BEGIN NEW.updated_at = NOW(); RETURN NEW; END; $$ LANGUAGE plpgsql;
+#   CREATE TRIGGER mpi_reports_updated_at BEFORE UPDATE ON mpi_reports
+#       FOR EACH ROW EXECUTE FUNCTION set_updated_at();
+# Without the column every open falls back to a full fetch.
+#
+# Saves upsert on the (start_date, end_date) week. After the updated_at step
+# above, remove duplicate weeks (keeping the most recently saved one), then
+# add the constraint:
+#   DELETE FROM mpi_reports a USING mpi_reports b
+#    WHERE a.start_date = b.start_date AND a.end_date = b.end_date
+#      AND (a.updated_at, a.created_at, a.id::text) < (b.updated_at, b.created_at, b.id::text);
+#   ALTER TABLE mpi_reports ADD CONSTRAINT mpi_reports_period_key UNIQUE (start_date, end_date);
+# Until then saves fall back to look-up-then-write, one week at a time
+# (see mpi_reports.save_reports).
+# MPI_REPORT_CACHE_DIR overrides the disk tier location (the load test uses a temp dir)
+REPORT_CACHE_DIR = (os.environ.get("MPI_REPORT_CACHE_DIR")
+                    or os.path.join(os.path.dirname(os.path.abspath(__file__)), ".report_cache"))
+
+@st.cache_resource
+def init_report_cache():
+    return ReportCache(max_items=64, disk_dir=REPORT_CACHE_DIR)
+
+report_cache = init_report_cache()
+
 # ──────────────────────
 # Config Page
 # ──────────────────────
@@ -47,30 +84,25 @@ def get_tier_color(mpi):
     else:
         return "#e74c3c"  # Red
 
+def save_reports_to_supabase(reports):
+    """Persist many weeks at once (see mpi_reports.save_reports); ids in input order."""
+    if not supabase or not reports:
+        return []
+    ids = save_reports(supabase, reports, on_fallback=lambda: st.warning(
+        "Contrainte mpi_reports_period_key absente : sauvegarde semaine par semaine. "
+        "Exécutez le SQL de configuration pour activer l'upsert."))
+    for report_id in ids:
+        if report_id is not None:
+            report_cache.invalidate(report_id)
+    return ids
+
 def save_report_to_supabase(start_date, end_date, df_json):
     if not supabase:
         return None
     try:
-        # Check for duplicate
-        existing = supabase.table("mpi_reports").select("id").eq("start_date", start_date.isoformat()).eq("end_date", end_date.isoformat()).execute()
-        
-        data = {
-            "start_date": start_date.isoformat(),
-            "end_date": end_date.isoformat(),
-            "report_data": df_json
-        }
-        
-        if existing.data:
-            # Update existing
-            report_id = existing.data[0]['id']
-            supabase.table("mpi_reports").update(data).eq("id", report_id).execute()
-            return report_id
-        else:
-            # Insert new
-            response = supabase.table("mpi_reports").insert(data).execute()
-            if response.data:
-                return response.data[0]['id']
-        return None
+        # Single round-trip upsert; the trigger bumps updated_at on overwrite
+        ids = save_reports_to_supabase([(start_date, end_date, df_json)])
+        return ids[0] if ids else None
     except Exception as e:
         st.error(f"Erreur lors de la sauvegarde: {e}")
         return None
@@ -80,6 +112,7 @@ def delete_report(report_id):
         return False
     try:
         supabase.table("mpi_reports").delete().eq("id", report_id).execute()
+        report_cache.invalidate(report_id)
         return True
     except Exception as e:
         st.error(f"Erreur lors de la suppression: {e}")
@@ -97,6 +130,60 @@ def get_report_from_supabase(report_id):
         st.error(f"Erreur lors du chargement: {e}")
         return None
 
+def get_report_version(report_id):
+    """Cheap version check: the row's updated_at.
+    
+    Returns False if the report does not exist and None if the version is unavailable.
+    """
+    if not supabase:
+        return None
+    try:
+        response = supabase.table("mpi_reports").select("id, updated_at").eq("id", report_id).execute()
+    except Exception:
+        # Column missing or transient error: caller falls back to a full fetch
+        return None
+    if not response.data:
+        return False
+    return response.data[0].get("updated_at")
+
+def decode_report(report_data):
+    """Turn a stored report row into the daily DataFrame shown by the dashboard."""
+    df_final = pd.read_json(io.StringIO(json.dumps(report_data['report_data'])))
+    if "Date" in df_final.columns:
+         df_final["Date"] = pd.to_datetime(df_final["Date"], unit='ms').dt.date
+    
+    # Backward compatibility for old reports
+    if "Employees List" not in df_final.columns:
+        df_final["Employees List"] = [[] for _ in range(len(df_final))]
+    if "Clients List" not in df_final.columns:
+        df_final["Clients List"] = [[] for _ in range(len(df_final))]
+    if EMPLOYEE_STATS not in df_final.columns:
+        df_final[EMPLOYEE_STATS] = [[] for _ in range(len(df_final))]
+    return df_final
+
+def open_report(report_id):
+    """Report metadata and decoded DataFrame, served from cache when current.
+    
+    Returns (report_row_without_data, df_final), or (None, None) if not found.
+    """
+    version = get_report_version(report_id)
+    if version is False:
+        report_cache.invalidate(report_id)
+        return None, None
+    
+    cached = report_cache.get(report_id, version)
+    if cached is None:
+        report_data = get_report_from_supabase(report_id)
+        if not report_data:
+            return None, None
+        meta = {k: v for k, v in report_data.items() if k != "report_data"}
+        cached = (meta, decode_report(report_data))
+        report_cache.put(report_id, report_data.get("updated_at", version), cached)
+    
+    meta, df_final = cached
+    # Callers add columns; never hand out the cached frame itself
+    return meta, df_final.copy()
+
 def get_all_reports():
     if not supabase:
         return []
@@ -106,9 +193,272 @@ def get_all_reports():
     except Exception as e:
         return []
 
+# ──────────────────────
+# Fragments
+# ──────────────────────
+# Each block reruns on its own when one of its widgets changes; its data
+# dependencies are exactly its arguments.
+
+@st.fragment
+@timed("Historique")
+def render_history():
+    st.subheader("Historique")
+    reports = get_all_reports()
+    if reports:
+        for rep in reports:
+            # Calculate Week Number
+            try:
+                s_date = datetime.strptime(rep['start_date'], "%Y-%m-%d")
+                week_num = s_date.isocalendar()[1]
+                label = f"[W{week_num}] {rep['start_date']} au {rep['end_date']}"
+            except:
+                label = f"{rep['start_date']} au {rep['end_date']}"
+
+            col_nav, col_del = st.columns([0.8, 0.2])
+            with col_nav:
+                if st.button(label, key=f"btn_{rep['id']}"):
+                    st.query_params["id"] = rep['id']
+                    st.rerun()
+            with col_del:
+                if st.button("🗑️", key=f"del_{rep['id']}", help="Supprimer ce rapport"):
+                    if delete_report(rep['id']):
+                        st.success("Supprimé")
+                        st.rerun()
+    else:
+        st.write("Aucun rapport sauvegardé.")
+
+@st.fragment
+@timed("Global Overview")
+def render_overview(all_reports):
+    # Multiselect for periods
+    report_options = {f"{r['start_date']} au {r['end_date']}": r for r in all_reports}
+    selected_labels = st.multiselect("Choisir les périodes", list(report_options.keys()), default=list(report_options.keys())[:5])
+
+    if selected_labels:
+        overview_data = []
+        employee_frames = []
+
+        for label in selected_labels:
+            rep = report_options[label]
+            try:
+                df_rep = pd.read_json(io.StringIO(json.dumps(rep['report_data'])))
+
+                # Aggregations
+                total_ca = df_rep["CA ($)"].sum()
+                total_hours = df_rep["Heures payées"].sum()
+                total_jobs = df_rep["Jobs"].sum()
+                total_emps = df_rep["Employees"].sum() # Sum of daily employees (approx effort)
+
+                mpi = total_ca / total_hours if total_hours > 0 else 0
+                jobs_per_emp = total_jobs / total_emps if total_emps > 0 else 0
+                rev_per_job = total_ca / total_jobs if total_jobs > 0 else 0
+
+                overview_data.append({
+                    "Period": label,
+                    "Start Date": rep['start_date'],
+                    "MPI": mpi,
+                    "CA": total_ca,
+                    "Hours": total_hours,
+                    "Jobs": total_jobs,
+                    "Jobs/Emp": jobs_per_emp,
+                    "Rev/Job": rev_per_job
+                })
+                employee_frames.append(employee_fact(df_rep).assign(Period=label, **{"Start Date": rep['start_date']}))
+            except Exception as e:
+                continue
+
+        df_overview = pd.DataFrame(overview_data).sort_values("Start Date")
+
+        # Display Comparative Metrics
+        st.subheader("Comparatif")
+        st.dataframe(
+            df_overview.style.format({
+                "MPI": "{:.2f} $/h",
+                "CA": "{:,.0f} $",
+                "Hours": "{:.1f} h",
+                "Jobs": "{:.0f}",
+                "Jobs/Emp": "{:.1f}",
+                "Rev/Job": "{:.0f} $"
+            }),
+            use_container_width=True
+        )
+
+        # Charts
+        c1, c2 = st.columns(2)
+        with c1:
+            fig_mpi = px.line(df_overview, x="Period", y="MPI", markers=True, title="Évolution du MPI")
+            fig_mpi.update_traces(line_color='#2980b9', line_width=3)
+            st.plotly_chart(fig_mpi, use_container_width=True)
+
+        with c2:
+            fig_ca = px.bar(df_overview, x="Period", y="CA", title="Évolution du Chiffre d'Affaires")
+            fig_ca.update_traces(marker_color='#2ecc71')
+            st.plotly_chart(fig_ca, use_container_width=True)
+
+        # Per employee, from the fact stored with each report
+        employee_periods = pd.concat(employee_frames, ignore_index=True) if employee_frames else pd.DataFrame()
+        if not employee_periods.empty:
+            st.subheader("👤 MPI par Employé")
+            board = employee_leaderboard(employee_periods)
+            board = board[board["Heures payées"] > 0]
+            st.dataframe(
+                board[["Employee", "MPI ($/h)", "CA ($)", "Heures payées", "Jobs"]],
+                use_container_width=True,
+                hide_index=True,
+                column_config={
+                    "Employee": st.column_config.TextColumn("Employé"),
+                    "MPI ($/h)": st.column_config.NumberColumn(format="%.2f $/h"),
+                    "CA ($)": st.column_config.NumberColumn(format="%.0f $"),
+                    "Heures payées": st.column_config.NumberColumn(format="%.1f h"),
+                }
+            )
+            trend = employee_leaderboard(employee_periods, by=("Start Date", "Period", "Employee"))
+            trend = trend[trend["Employee"].isin(board["Employee"])].sort_values("Start Date")
+            fig_emp = px.line(trend, x="Period", y="MPI ($/h)", color="Employee", markers=True, title="Évolution du MPI par employé")
+            st.plotly_chart(fig_emp, use_container_width=True)
+
+@st.fragment
+@timed("Partage")
+def render_share_box(report_id):
+    with st.expander("🔗 Partager ce rapport", expanded=False):
+        base_url = st.text_input("Base URL (ex: https://mon-app.streamlit.app)", value="http://localhost:8501")
+        full_url = f"{base_url}/?id={report_id}"
+        st.code(full_url, language="text")
+        st.caption("Copiez l'URL ci-dessus pour partager.")
+
+@st.fragment
+@timed("KPIs")
+def render_kpis(df_final):
+    total_ca = df_final["CA ($)"].sum()
+    total_heures = df_final["Heures payées"].sum()
+    total_jobs = df_final["Jobs"].sum()
+    avg_mpi = total_ca / total_heures if total_heures > 0 else 0
+
+    avg_jobs_per_emp = df_final["Jobs/Emp"].mean()
+    rev_per_job = total_ca / total_jobs if total_jobs > 0 else 0
+
+    st.divider()
+
+    kpi1, kpi2, kpi3, kpi4 = st.columns(4)
+    kpi1.metric("MPI Moyen", f"{avg_mpi:.2f} $/h", delta_color="normal")
+    kpi2.metric("CA Total", f"{total_ca:,.0f} $")
+    kpi3.metric("Heures Totales", f"{total_heures:.1f} h")
+    kpi4.metric("Jobs Totaux", f"{total_jobs}")
+
+    st.caption("📊 Statistiques Avancées")
+    s1, s2, s3 = st.columns(3)
+    s1.metric("Jobs / Employé (Moyenne)", f"{avg_jobs_per_emp:.1f}")
+    s2.metric("Revenu Moyen / Job", f"{rev_per_job:.0f} $")
+    s3.metric("Employés (Max/Jour)", f"{df_final['Employees'].max()}")
+
+    st.divider()
+
+@st.fragment
+@timed("Graphique MPI")
+def render_mpi_chart(df_final):
+    st.subheader("📈 Évolution du MPI & Tiers")
+    fig = go.Figure()
+    x_min = df_final["Date"].min()
+    x_max = df_final["Date"].max()
+
+    fig.add_shape(type="rect", x0=x_min, x1=x_max, y0=0, y1=35, fillcolor="rgba(231, 76, 60, 0.1)", line=dict(width=0), layer="below")
+    fig.add_shape(type="rect", x0=x_min, x1=x_max, y0=35, y1=47, fillcolor="rgba(46, 204, 113, 0.1)", line=dict(width=0), layer="below")
+    y_max_graph = max(df_final["MPI ($/h)"].max() * 1.1, 60)
+    fig.add_shape(type="rect", x0=x_min, x1=x_max, y0=47, y1=y_max_graph, fillcolor="rgba(41, 128, 185, 0.1)", line=dict(width=0), layer="below")
+
+    fig.add_trace(go.Scatter(
+        x=df_final["Date"], 
+        y=df_final["MPI ($/h)"],
+        mode='lines+markers',
+        name='MPI',
+        line=dict(color='#34495e', width=3),
+        marker=dict(size=10, color=[get_tier_color(m) for m in df_final["MPI ($/h)"]], line=dict(width=2, color='white'))
+    ))
+
+    fig.update_layout(yaxis_title="MPI ($/h)", xaxis_title="Date", template="plotly_white", margin=dict(l=20, r=20, t=20, b=20), yaxis=dict(range=[0, y_max_graph]))
+    st.plotly_chart(fig, use_container_width=True)
+
+@st.fragment
+@timed("Détails Journaliers")
+def render_daily_table(df_final):
+    st.subheader("Détails Journaliers")
+
+    df_display = df_final.copy()
+    # We don't format Date as string here, we let column_config handle it for sorting
+    df_display["Performance"] = df_display["MPI ($/h)"].apply(get_tier)
+
+    st.dataframe(
+        df_display[["Date", "Performance", "MPI ($/h)", "CA ($)", "Heures payées", "Jobs", "Employees List", "Clients List"]],
+        use_container_width=True,
+        column_config={
+            "Date": st.column_config.DateColumn("Date", format="ddd, DD MMM YYYY"),
+            "MPI ($/h)": st.column_config.NumberColumn(format="%.2f $/h"),
+            "CA ($)": st.column_config.NumberColumn(format="%.2f $"),
+            "Heures payées": st.column_config.NumberColumn(format="%.2f h"),
+            "Employees List": st.column_config.ListColumn("Employés"),
+            "Clients List": st.column_config.ListColumn("Clients"),
+        }
+    )
+
+@st.fragment
+@timed("MPI par employé")
+def render_employee_mpi(df_final):
+    st.subheader("👤 MPI par Employé")
+    fact = employee_fact(df_final)
+    if fact.empty:
+        st.info("Ce rapport ne contient pas le détail par employé. Ré-uploadez les fichiers pour le calculer.")
+        return
+
+    board = employee_leaderboard(fact)
+    paid = board[board["Heures payées"] > 0].assign(Performance=lambda b: b["MPI ($/h)"].apply(get_tier))
+    unpaid = board[board["Heures payées"] <= 0]
+
+    c1, c2 = st.columns(2)
+    with c1:
+        st.dataframe(
+            paid[["Employee", "Performance", "MPI ($/h)", "CA ($)", "Heures payées", "Jobs"]],
+            use_container_width=True,
+            hide_index=True,
+            column_config={
+                "Employee": st.column_config.TextColumn("Employé"),
+                "MPI ($/h)": st.column_config.NumberColumn(format="%.2f $/h"),
+                "CA ($)": st.column_config.NumberColumn(format="%.2f $"),
+                "Heures payées": st.column_config.NumberColumn(format="%.2f h"),
+            }
+        )
+    with c2:
+        fig = px.bar(paid, x="MPI ($/h)", y="Employee", orientation="h", color="MPI ($/h)",
+                     color_continuous_scale=["#e74c3c", "#2ecc71", "#2980b9"])
+        fig.update_layout(yaxis=dict(autorange="reversed", title=""), template="plotly_white",
+                          margin=dict(l=20, r=20, t=20, b=20), coloraxis_showscale=False)
+        st.plotly_chart(fig, use_container_width=True)
+
+    if not unpaid.empty:
+        st.caption(f"⚠️ {unpaid['CA ($)'].sum():,.0f} $ attribués à des membres sans feuille de paie : "
+                   + ", ".join(unpaid["Employee"]))
+
+    selected = st.multiselect("Tendance journalière", list(paid["Employee"]), default=list(paid["Employee"])[:3])
+    if selected:
+        daily = employee_leaderboard(fact[fact["Employee"].isin(selected)], by=("Date", "Employee")).sort_values("Date")
+        fig_trend = px.line(daily, x="Date", y="MPI ($/h)", color="Employee", markers=True)
+        fig_trend.update_layout(template="plotly_white", margin=dict(l=20, r=20, t=20, b=20))
+        st.plotly_chart(fig_trend, use_container_width=True)
+
+@st.fragment
+@timed("Export")
+def render_export(df_final):
+    output = io.BytesIO()
+    with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
+        df_final.drop(columns=[EMPLOYEE_STATS]).to_excel(writer, index=False, sheet_name="MPI")
+        fact = employee_fact(df_final)
+        if not fact.empty:
+            fact.to_excel(writer, index=False, sheet_name="MPI par employé")
+    st.download_button("📥 Télécharger le rapport Excel", output.getvalue(), "MYLE_MPI_Report.xlsx")
+
 # ──────────────────────
 # Interface Principale
 # ──────────────────────
+run_started = time.perf_counter()
 
 st.title("🚀 MYLE Performance Index – MPI Dashboard")
 
@@ -126,30 +476,7 @@ with st.sidebar:
             st.query_params.clear()
             st.rerun()
         
-        st.subheader("Historique")
-        reports = get_all_reports()
-        if reports:
-            for rep in reports:
-                # Calculate Week Number
-                try:
-                    s_date = datetime.strptime(rep['start_date'], "%Y-%m-%d")
-                    week_num = s_date.isocalendar()[1]
-                    label = f"[W{week_num}] {rep['start_date']} au {rep['end_date']}"
-                except:
-                    label = f"{rep['start_date']} au {rep['end_date']}"
-                
-                col_nav, col_del = st.columns([0.8, 0.2])
-                with col_nav:
-                    if st.button(label, key=f"btn_{rep['id']}"):
-                        st.query_params["id"] = rep['id']
-                        st.rerun()
-                with col_del:
-                    if st.button("🗑️", key=f"del_{rep['id']}", help="Supprimer ce rapport"):
-                        if delete_report(rep['id']):
-                            st.success("Supprimé")
-                            st.rerun()
-        else:
-            st.write("Aucun rapport sauvegardé.")
+        render_history()
             
     elif mode == "Global Overview":
         st.info("Sélectionnez les périodes à comparer ci-dessous.")
@@ -164,68 +491,7 @@ if mode == "Global Overview":
     if not all_reports:
         st.warning("Aucune donnée disponible.")
     else:
-        # Multiselect for periods
-        report_options = {f"{r['start_date']} au {r['end_date']}": r for r in all_reports}
-        selected_labels = st.multiselect("Choisir les périodes", list(report_options.keys()), default=list(report_options.keys())[:5])
-        
-        if selected_labels:
-            overview_data = []
-            
-            for label in selected_labels:
-                rep = report_options[label]
-                try:
-                    df_rep = pd.read_json(io.StringIO(json.dumps(rep['report_data'])))
-                    
-                    # Aggregations
-                    total_ca = df_rep["CA ($)"].sum()
-                    total_hours = df_rep["Heures payées"].sum()
-                    total_jobs = df_rep["Jobs"].sum()
-                    total_emps = df_rep["Employees"].sum() # Sum of daily employees (approx effort)
-                    
-                    mpi = total_ca / total_hours if total_hours > 0 else 0
-                    jobs_per_emp = total_jobs / total_emps if total_emps > 0 else 0
-                    rev_per_job = total_ca / total_jobs if total_jobs > 0 else 0
-                    
-                    overview_data.append({
-                        "Period": label,
-                        "Start Date": rep['start_date'],
-                        "MPI": mpi,
-                        "CA": total_ca,
-                        "Hours": total_hours,
-                        "Jobs": total_jobs,
-                        "Jobs/Emp": jobs_per_emp,
-                        "Rev/Job": rev_per_job
-                    })
-                except Exception as e:
-                    continue
-            
-            df_overview = pd.DataFrame(overview_data).sort_values("Start Date")
-            
-            # Display Comparative Metrics
-            st.subheader("Comparatif")
-            st.dataframe(
-                df_overview.style.format({
-                    "MPI": "{:.2f} $/h",
-                    "CA": "{:,.0f} $",
-                    "Hours": "{:.1f} h",
-                    "Jobs": "{:.0f}",
-                    "Jobs/Emp": "{:.1f}",
-                    "Rev/Job": "{:.0f} $"
-                }),
-                use_container_width=True
-            )
-            
-            # Charts
-            c1, c2 = st.columns(2)
-            with c1:
-                fig_mpi = px.line(df_overview, x="Period", y="MPI", markers=True, title="Évolution du MPI")
-                fig_mpi.update_traces(line_color='#2980b9', line_width=3)
-                st.plotly_chart(fig_mpi, use_container_width=True)
-            
-            with c2:
-                fig_ca = px.bar(df_overview, x="Period", y="CA", title="Évolution du Chiffre d'Affaires")
-                fig_ca.update_traces(marker_color='#2ecc71')
-                st.plotly_chart(fig_ca, use_container_width=True)
+        render_overview(all_reports)
 
 # ──────────────────────
 # Logic: Single Report
@@ -241,26 +507,12 @@ else:
 
     if report_id:
         # Mode Lecture
-        report_data = get_report_from_supabase(report_id)
+        report_data, df_final = open_report(report_id)
         if report_data:
             st.info(f"📅 Rapport du **{report_data['start_date']}** au **{report_data['end_date']}**")
             
             # Share Section
-            with st.expander("🔗 Partager ce rapport", expanded=False):
-                base_url = st.text_input("Base URL (ex: https://mon-app.streamlit.app)", value="http://localhost:8501")
-                full_url = f"{base_url}/?id={report_id}"
-                st.code(full_url, language="text")
-                st.caption("Copiez l'URL ci-dessus pour partager.")
-
-            df_final = pd.read_json(io.StringIO(json.dumps(report_data['report_data'])))
-            if "Date" in df_final.columns:
-                 df_final["Date"] = pd.to_datetime(df_final["Date"], unit='ms').dt.date
-            
-            # Backward compatibility for old reports
-            if "Employees List" not in df_final.columns:
-                df_final["Employees List"] = [[] for _ in range(len(df_final))]
-            if "Clients List" not in df_final.columns:
-                df_final["Clients List"] = [[] for _ in range(len(df_final))]
+            render_share_box(report_id)
 
         else:
             st.error("Rapport introuvable.")
@@ -271,52 +523,24 @@ else:
         with col1:
             payroll_file = st.file_uploader("1. Payroll Report (Time Squared)", type=["xlsx"])
         with col2:
-            appointments_file = st.file_uploader("2. Appointments / Facturation", type=["xlsx"])
+            appointments_file = st.file_uploader("2. Appointments / Facturation", type=SUPPORTED_TYPES)
 
         if payroll_file and appointments_file:
             with st.spinner("Analyse en cours..."):
-                # 1. Lecture Payroll
-                payroll_xl = pd.ExcelFile(payroll_file)
-                heures_par_jour = {}
-                employees_par_jour = {} # Set of names
-
-                for sheet_name in payroll_xl.sheet_names:
-                    if sheet_name[0].isdigit(): 
-                        df = pd.read_excel(payroll_file, sheet_name=sheet_name, header=5)
-                        if "Start date" in df.columns:
-                            for _, row in df.iterrows():
-                                try:
-                                    date_val = row["Start date"]
-                                    if pd.isna(date_val): continue
-                                    
-                                    if isinstance(date_val, (int, float)):
-                                        date = pd.to_datetime(date_val, unit='d', origin='1899-12-30').date()
-                                    else:
-                                        date = pd.to_datetime(date_val).date()
-                                    
-                                    heures = row.get("Total hours", row.get("Length (hours & minutes)", 0))
-                                    if isinstance(heures, str) and "h" in heures:
-                                        h, m = heures.split("h")
-                                        m = m.strip().replace("m", "")
-                                        heures = int(h) + int(m)/60
-                                    
-                                    h_val = float(heures)
-                                    if h_val > 0:
-                                        heures_par_jour[date] = heures_par_jour.get(date, 0) + h_val
-                                        
-                                        if date not in employees_par_jour:
-                                            employees_par_jour[date] = set()
-                                        # Clean name (remove "1. ")
-                                        emp_name = sheet_name.split('.', 1)[-1].strip() if '.' in sheet_name else sheet_name
-                                        employees_par_jour[date].add(emp_name)
-                                except:
-                                    continue
+                # 1. Lecture Payroll (one line per employee shift)
+                payroll = read_payroll(payroll_file)
+                heures_par_jour = payroll.groupby("Date")["Hours"].sum().to_dict()
+                employees_par_jour = payroll.groupby("Date")["Employee"].agg(set).to_dict()
 
                 # 2. Lecture Appointments
-                app_df = pd.read_excel(appointments_file)
-                app_df = app_df[app_df["Status"] == "Confirmed"]
-                app_df["Date"] = pd.to_datetime(app_df["Appointment date"], errors="coerce").dt.date
-                app_df["Cost"] = pd.to_numeric(app_df["Cost"], errors="coerce").fillna(0)
+                # Only confirmed rows and the needed columns are read; dates and costs come back typed
+                app_df = read_appointments(
+                    appointments_file,
+                    ["Appointment date", "Cost", "Customer name", "Team member"],
+                    required=["Appointment date", "Cost"],
+                    status="Confirmed",
+                )
+                app_df["Date"] = app_df["Appointment date"].dt.date
                 
                 ca_par_jour = app_df.groupby("Date")["Cost"].sum().to_dict()
                 jobs_par_jour = app_df.groupby("Date").size().to_dict()
@@ -332,6 +556,9 @@ else:
                                 clients_par_jour[d] = set()
                             clients_par_jour[d].add(str(c_name))
 
+                # Per employee per day hours and attributed revenue, stored with each day
+                employee_stats_par_jour = stats_by_day(employee_day_fact(payroll, app_df))
+
                 # 3. Fusion
                 all_dates = sorted(set(list(heures_par_jour.keys()) + list(ca_par_jour.keys())))
                 resultats = []
@@ -357,6 +584,7 @@ else:
                         "Employees": nb_employees,
                         "Employees List": sorted(list(emps_set)),
                         "Clients List": sorted(list(clients_set)),
+                        EMPLOYEE_STATS: employee_stats_par_jour.get(date, []),
                         "Tier": get_tier(mpi)
                     })
 
@@ -386,77 +614,13 @@ else:
         if df_final["Employees List"].apply(lambda x: isinstance(x, str) and x == "-").any():
              st.warning("⚠️ Ce rapport a été créé avec une ancienne version. Veuillez ré-uploader les fichiers pour voir les détails des employés et clients.")
 
-        # KPIs
-        total_ca = df_final["CA ($)"].sum()
-        total_heures = df_final["Heures payées"].sum()
-        total_jobs = df_final["Jobs"].sum()
-        avg_mpi = total_ca / total_heures if total_heures > 0 else 0
-        
         df_final["Jobs/Emp"] = df_final.apply(lambda x: x["Jobs"] / x["Employees"] if x["Employees"] > 0 else 0, axis=1)
-        avg_jobs_per_emp = df_final["Jobs/Emp"].mean()
-        rev_per_job = total_ca / total_jobs if total_jobs > 0 else 0
-        
-        st.divider()
-        
-        kpi1, kpi2, kpi3, kpi4 = st.columns(4)
-        kpi1.metric("MPI Moyen", f"{avg_mpi:.2f} $/h", delta_color="normal")
-        kpi2.metric("CA Total", f"{total_ca:,.0f} $")
-        kpi3.metric("Heures Totales", f"{total_heures:.1f} h")
-        kpi4.metric("Jobs Totaux", f"{total_jobs}")
-
-        st.caption("📊 Statistiques Avancées")
-        s1, s2, s3 = st.columns(3)
-        s1.metric("Jobs / Employé (Moyenne)", f"{avg_jobs_per_emp:.1f}")
-        s2.metric("Revenu Moyen / Job", f"{rev_per_job:.0f} $")
-        s3.metric("Employés (Max/Jour)", f"{df_final['Employees'].max()}")
-
-        st.divider()
-
-        # Graph
-        st.subheader("📈 Évolution du MPI & Tiers")
-        fig = go.Figure()
-        x_min = df_final["Date"].min()
-        x_max = df_final["Date"].max()
-        
-        fig.add_shape(type="rect", x0=x_min, x1=x_max, y0=0, y1=35, fillcolor="rgba(231, 76, 60, 0.1)", line=dict(width=0), layer="below")
-        fig.add_shape(type="rect", x0=x_min, x1=x_max, y0=35, y1=47, fillcolor="rgba(46, 204, 113, 0.1)", line=dict(width=0), layer="below")
-        y_max_graph = max(df_final["MPI ($/h)"].max() * 1.1, 60)
-        fig.add_shape(type="rect", x0=x_min, x1=x_max, y0=47, y1=y_max_graph, fillcolor="rgba(41, 128, 185, 0.1)", line=dict(width=0), layer="below")
-
-        fig.add_trace(go.Scatter(
-            x=df_final["Date"], 
-            y=df_final["MPI ($/h)"],
-            mode='lines+markers',
-            name='MPI',
-            line=dict(color='#34495e', width=3),
-            marker=dict(size=10, color=[get_tier_color(m) for m in df_final["MPI ($/h)"]], line=dict(width=2, color='white'))
-        ))
-
-        fig.update_layout(yaxis_title="MPI ($/h)", xaxis_title="Date", template="plotly_white", margin=dict(l=20, r=20, t=20, b=20), yaxis=dict(range=[0, y_max_graph]))
-        st.plotly_chart(fig, use_container_width=True)
 
-        # Tableau
-        st.subheader("Détails Journaliers")
-        
-        df_display = df_final.copy()
-        # We don't format Date as string here, we let column_config handle it for sorting
-        df_display["Performance"] = df_display["MPI ($/h)"].apply(get_tier)
-        
-        st.dataframe(
-            df_display[["Date", "Performance", "MPI ($/h)", "CA ($)", "Heures payées", "Jobs", "Employees List", "Clients List"]],
-            use_container_width=True,
-            column_config={
-                "Date": st.column_config.DateColumn("Date", format="ddd, DD MMM YYYY"),
-                "MPI ($/h)": st.column_config.NumberColumn(format="%.2f $/h"),
-                "CA ($)": st.column_config.NumberColumn(format="%.2f $"),
-                "Heures payées": st.column_config.NumberColumn(format="%.2f h"),
-                "Employees List": st.column_config.ListColumn("Employés"),
-                "Clients List": st.column_config.ListColumn("Clients"),
-            }
-        )
+        render_kpis(df_final)
+        render_mpi_chart(df_final)
+        render_daily_table(df_final)
+        render_employee_mpi(df_final)
+        render_export(df_final)
 
-        # Export
-        output = io.BytesIO()
-        with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
-            df_final.to_excel(writer, index=False, sheet_name="MPI")
-        st.download_button("📥 Télécharger le rapport Excel", output.getvalue(), "MYLE_MPI_Report.xlsx")
\ No newline at end of file
+record_timing("Page complète", (time.perf_counter() - run_started) * 1000)
+show_timings(supabase)
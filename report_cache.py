@@ -0,0 +1,93 @@
+import hashlib
+import os
+import pickle
+import threading
+from collections import OrderedDict
+from typing import Any, Optional
+
+
+class ReportCache:
+    """Two-tier cache of decoded reports, validated by a version stamp.
+
+    Entries are (version, value) pairs. A lookup only hits when the caller's
+    current version matches the stored one, so a stale entry is never
+    served. The memory tier is a bounded LRU; the disk tier survives
+    restarts and is promoted to memory on hit.
+    """
+
+    def __init__(self, max_items: int = 64, disk_dir: Optional[str] = None):
+        self.max_items = max_items
+        self.disk_dir = disk_dir
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    def _path(self, key) -> Optional[str]:
+        if not self.disk_dir:
+            return None
+        name = hashlib.sha1(str(key).encode("utf-8")).hexdigest()
+        return os.path.join(self.disk_dir, f"{name}.pkl")
+
+    def _remember(self, key, version, value):
+        self._items[key] = (version, value)
+        self._items.move_to_end(key)
+        while len(self._items) > self.max_items:
+            self._items.popitem(last=False)
+
+    def get(self, key, version) -> Optional[Any]:
+        """Cached value for key if it was stored under `version`, else None."""
+        if version is None:
+            return None
+        with self._lock:
+            entry = self._items.get(key)
+            if entry is not None:
+                if entry[0] == version:
+                    self._items.move_to_end(key)
+                    return entry[1]
+                del self._items[key]
+
+        path = self._path(key)
+        if path and os.path.exists(path):
+            try:
+                with open(path, "rb") as f:
+                    stored_version, value = pickle.load(f)
+            except Exception:
+                stored_version, value = None, None
+            if stored_version == version:
+                with self._lock:
+                    self._remember(key, version, value)
+                return value
+            self._remove_file(path)
+        return None
+
+    def put(self, key, version, value):
+        """Store value for key under `version` in both tiers."""
+        if version is None:
+            return
+        with self._lock:
+            self._remember(key, version, value)
+        path = self._path(key)
+        if path:
+            tmp = f"{path}.{threading.get_ident()}.tmp"
+            try:
+                with open(tmp, "wb") as f:
+                    pickle.dump((version, value), f, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(tmp, path)
+            except Exception:
+                self._remove_file(tmp)
+
+    def invalidate(self, key):
+        """Forget key in both tiers."""
+        with self._lock:
+            self._items.pop(key, None)
+        path = self._path(key)
+        if path:
+            self._remove_file(path)
+
+    @staticmethod
+    def _remove_file(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
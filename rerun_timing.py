@@ -0,0 +1,47 @@
+import time
+from functools import wraps
+
+import pandas as pd
+import streamlit as st
+
+_TIMINGS_KEY = "_rerun_timings"
+
+
+def record_timing(name: str, ms: float):
+    """Remember the last run duration of a page block for this session."""
+    st.session_state.setdefault(_TIMINGS_KEY, {})[name] = ms
+
+
+def timed(name: str):
+    """Decorator recording how long a block (typically a fragment) takes to run."""
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                record_timing(name, (time.perf_counter() - started) * 1000)
+        return wrapper
+    return decorator
+
+
+def show_timings(backend=None):
+    """Show the last rerun durations when the page is opened with ?timing=1.
+
+    With `backend` (a BackendTransport), per-endpoint call latencies are shown too.
+    """
+    if not st.query_params.get("timing"):
+        return
+    timings = st.session_state.get(_TIMINGS_KEY, {})
+    if timings:
+        st.caption("⏱️ Last run per block (ms)")
+        st.dataframe(
+            pd.DataFrame({"Block": list(timings), "ms": [round(v, 1) for v in timings.values()]}),
+            hide_index=True,
+        )
+    if backend is not None:
+        stats = backend.stats()
+        if stats:
+            st.caption("🌐 Backend calls per endpoint (since server start)")
+            st.dataframe(pd.DataFrame(stats), hide_index=True)
@@ -0,0 +1,3 @@
+@echo off
+python load_test.py %*
+pause
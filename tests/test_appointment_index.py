@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from appointment_index import AppointmentIndex
+
+
+@pytest.fixture
+def appointments():
+    rng = np.random.default_rng(0)
+    n = 2000
+    dates = pd.Timestamp("2024-01-01") + pd.to_timedelta(rng.integers(0, 400, n), unit="D")
+    dates = dates + pd.to_timedelta(rng.integers(0, 24, n), unit="h")
+    return pd.DataFrame({
+        "Appointment date": dates,
+        "Cost": rng.uniform(50, 300, n).round(2),
+        "identifier": [f"c{i}" for i in rng.integers(0, 150, n)],
+    })
+
+
+def brute_force(df, start, end):
+    day_after = pd.Timestamp(end) + pd.Timedelta(days=1)
+    return df[(df["Appointment date"] >= pd.Timestamp(start)) & (df["Appointment date"] < day_after)]
+
+
+@pytest.mark.parametrize("start,end", [
+    ("2024-01-01", "2025-02-03"),   # everything
+    ("2024-03-15", "2024-03-20"),   # inside one month
+    ("2024-02-10", "2024-07-05"),   # partial edges around whole months
+    ("2024-05-01", "2024-05-31"),   # exactly one month
+    ("2026-01-01", "2026-02-01"),   # after the data
+])
+def test_summary_matches_brute_force(appointments, start, end):
+    index = AppointmentIndex(appointments)
+    expected = brute_force(appointments, start, end)
+
+    got = index.summary(start, end)
+    assert got["spend"] == pytest.approx(expected["Cost"].sum())
+    assert got["visits"] == len(expected)
+    assert got["unique_clients"] == expected["identifier"].nunique()
+    assert len(index.slice(start, end)) == len(expected)
+
+
+def test_summary_resolves_linked_identifiers(appointments):
+    index = AppointmentIndex(appointments)
+    links = {f"c{i}": "master" for i in range(10)}
+    expected = brute_force(appointments, "2024-02-10", "2024-07-05")["identifier"]
+
+    got = index.summary("2024-02-10", "2024-07-05", resolve=links)
+    assert got["unique_clients"] == expected.map(links).fillna(expected).nunique()
+
+
+def test_unsorted_input_and_missing_dates(appointments):
+    shuffled = appointments.sample(frac=1, random_state=1)
+    shuffled.loc[shuffled.index[:5], "Appointment date"] = pd.NaT
+    index = AppointmentIndex(shuffled)
+
+    assert len(index) == len(appointments) - 5
+    assert index.df["Appointment date"].is_monotonic_increasing
+    assert index.min_date == index.df["Appointment date"].min().date()
+
+
+def test_empty_frame():
+    index = AppointmentIndex(pd.DataFrame())
+    assert index.empty
+    assert index.min_date is None
+    assert index.summary()["visits"] == 0
@@ -0,0 +1,76 @@
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from appointments_import import read_appointments
+
+COLUMNS = ["Appointment date", "Cost", "Customer name", "Team member"]
+
+
+def named(buf, name):
+    buf.seek(0)
+    buf.name = name
+    return buf
+
+
+@pytest.fixture
+def export():
+    return pd.DataFrame({
+        " Appointment date ": ["2024-03-01 09:00", "2024-03-02 10:30", "03/04/2024", "2024-03-05"],
+        "Cost": ["120", "80.5", "", "60"],
+        "Customer name": ["Ann", None, "Bob", "Cid"],
+        "Status": ["Confirmed", "Confirmed", "Confirmed", "Cancelled"],
+        "Unused": [1, 2, 3, 4],
+    })
+
+
+def csv_file(df):
+    buf = io.BytesIO()
+    df.to_csv(buf, index=False)
+    return named(buf, "export.csv")
+
+
+def xlsx_file(df):
+    buf = io.BytesIO()
+    df.to_excel(buf, index=False)
+    return named(buf, "export.xlsx")
+
+
+def parquet_file(df):
+    buf = io.BytesIO()
+    df.astype(str).to_parquet(buf, index=False)
+    return named(buf, "export.parquet")
+
+
+@pytest.mark.parametrize("make", [csv_file, xlsx_file])
+def test_reads_typed_confirmed_rows(export, make):
+    df = read_appointments(make(export), COLUMNS, required=["Appointment date", "Cost"], status="Confirmed")
+
+    assert list(df.columns) == COLUMNS + ["Status"]
+    assert len(df) == 3
+    assert pd.api.types.is_datetime64_any_dtype(df["Appointment date"])
+    # The straggler in another format is still parsed
+    assert df["Appointment date"].notna().all()
+    assert df["Cost"].dtype == np.float64
+    assert df["Cost"].tolist() == [120.0, 80.5, 0.0]
+    assert pd.isna(df["Customer name"].iloc[1])
+    # Missing optional column is added empty (None, not pd.NA)
+    assert df["Team member"].isna().all()
+    assert all(v is None or v != v for v in df["Team member"])
+
+
+def test_parquet(export):
+    df = read_appointments(parquet_file(export), ["Appointment date", "Cost"], status="Confirmed")
+    assert len(df) == 3
+
+
+def test_missing_required_column(export):
+    with pytest.raises(ValueError, match="Booking ID"):
+        read_appointments(csv_file(export), COLUMNS + ["Booking ID"], required=["Booking ID"])
+
+
+def test_unsupported_type(export):
+    with pytest.raises(ValueError, match="Unsupported"):
+        read_appointments(named(io.BytesIO(b""), "export.txt"), COLUMNS)
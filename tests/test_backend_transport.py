@@ -0,0 +1,138 @@
+import threading
+
+import pytest
+
+from backend_transport import BackendTransport
+
+
+class APIError(Exception):
+    """Shaped like postgrest's APIError: the HTTP status is a string .code, no .response."""
+
+    def __init__(self, code):
+        super().__init__(f"status {code}")
+        self.code = code
+
+
+class StubQuery:
+    def __init__(self, client, table):
+        self.client = client
+        self.table = table
+        self.calls = []
+
+    def __getattr__(self, name):
+        def step(*args, **kwargs):
+            self.calls.append(name)
+            return self
+        return step
+
+    def execute(self):
+        return self.client.respond(self.table, self.calls)
+
+
+class StubClient:
+    """Raises the queued errors in order, then answers with the table's current rows."""
+
+    def __init__(self, errors=()):
+        self.errors = list(errors)
+        self.sent = 0
+        self.rows = {}
+
+    def table(self, name):
+        return StubQuery(self, name)
+
+    def respond(self, table, calls):
+        self.sent += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        if "insert" in calls:
+            self.rows[table] = self.rows.get(table, 0) + 1
+        return self.rows.get(table, 0)
+
+
+def transport(client):
+    return BackendTransport(client, retries=3, backoff_base=0, backoff_max=0)
+
+
+@pytest.mark.parametrize("error", [TimeoutError(), ConnectionError(), APIError("503"), APIError("429")])
+def test_transient_read_errors_are_retried(error):
+    client = StubClient([error, error])
+    assert transport(client).table("t").select("*").execute() == 0
+    assert client.sent == 3
+
+
+@pytest.mark.parametrize("error", [APIError("400"), APIError("23505"), APIError("42P10"), ValueError()])
+def test_other_read_errors_are_not_retried(error):
+    client = StubClient([error])
+    with pytest.raises(type(error)):
+        transport(client).table("t").select("*").execute()
+    assert client.sent == 1
+
+
+def test_retries_are_bounded():
+    client = StubClient([TimeoutError()] * 10)
+    with pytest.raises(TimeoutError):
+        transport(client).table("t").select("*").execute()
+    assert client.sent == 4
+
+
+def test_writes_are_sent_once():
+    client = StubClient([TimeoutError()])
+    with pytest.raises(TimeoutError):
+        transport(client).table("t").insert({"a": 1}).execute()
+    assert client.sent == 1
+
+
+class GatedClient(StubClient):
+    """Holds reads of the table until released, so they overlap."""
+
+    def __init__(self):
+        super().__init__()
+        self.release = threading.Event()
+        self.reading = threading.Event()
+
+    def respond(self, table, calls):
+        if "insert" not in calls:
+            self.reading.set()
+            self.release.wait(5)
+        return super().respond(table, calls)
+
+
+def read_in_thread(t, results):
+    thread = threading.Thread(target=lambda: results.append(t.table("t").select("*").execute()))
+    thread.start()
+    return thread
+
+
+def test_identical_concurrent_reads_share_one_request():
+    client = GatedClient()
+    t = transport(client)
+    results = []
+    leader = read_in_thread(t, results)
+    client.reading.wait(5)
+    followers = [read_in_thread(t, results) for _ in range(3)]
+    while t.stats()[0]["Coalesced"] < 3:
+        threading.Event().wait(0.01)
+    client.release.set()
+    for thread in [leader, *followers]:
+        thread.join(5)
+
+    assert results == [0, 0, 0, 0]
+    assert client.sent == 1
+
+
+def test_read_after_write_does_not_join_an_older_flight():
+    client = GatedClient()
+    t = transport(client)
+    results = []
+    before = read_in_thread(t, results)
+    client.reading.wait(5)
+
+    t.table("t").insert({"a": 1}).execute()
+    after = threading.Thread(target=lambda: results.append(("after", t.table("t").select("*").execute())))
+    after.start()
+    client.release.set()
+    before.join(5)
+    after.join(5)
+
+    assert ("after", 1) in results
+    assert client.sent == 3
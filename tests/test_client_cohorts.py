@@ -0,0 +1,96 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from appointment_index import AppointmentIndex
+from client_cohorts import CohortStore, cohort_matrices, month_numbers, monthly_aggregates
+
+
+def appointments(seed=0, n=1500):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "Booking ID": [f"b{i}" for i in range(n)],
+        "Appointment date": pd.Timestamp("2024-01-01") + pd.to_timedelta(rng.integers(0, 365, n), unit="D"),
+        "Cost": rng.uniform(50, 300, n).round(2),
+        "identifier": [f"c{i}" for i in rng.integers(0, 120, n)],
+    })
+
+
+def canonical(monthly):
+    return monthly.sort_values(["identifier", "month"], ignore_index=True)
+
+
+def publish(store, df, months):
+    """What the dashboard does on its own write: mark dirty, then reload."""
+    store.mark_dirty(months)
+    index = AppointmentIndex(df)
+    store.note_load(index)
+    return index
+
+
+def test_incremental_sync_matches_full_rebuild():
+    df = appointments()
+    store = CohortStore()
+    store.sync(AppointmentIndex(df))
+
+    # Move one booking to another month and add a new one
+    changed = df.copy()
+    old_date = changed.loc[0, "Appointment date"]
+    changed.loc[0, "Appointment date"] = pd.Timestamp("2024-12-15")
+    changed.loc[len(changed)] = ["new", pd.Timestamp("2024-06-02"), 99.0, "c1"]
+    months = month_numbers(pd.Series([old_date, pd.Timestamp("2024-12-15"), pd.Timestamp("2024-06-02")]))
+
+    got = store.sync(publish(store, changed, months))
+    pd.testing.assert_frame_equal(canonical(got), canonical(monthly_aggregates(changed)), check_dtype=False)
+
+
+def test_foreign_reload_triggers_full_rebuild():
+    df = appointments()
+    store = CohortStore()
+    store.sync(AppointmentIndex(df))
+
+    # Our write marks one month dirty, but the index we then see is a TTL
+    # reload that also carries another writer's change elsewhere
+    store.mark_dirty([month_numbers(pd.Series([pd.Timestamp("2024-03-01")])).iloc[0]])
+    ours = AppointmentIndex(df)
+    store.note_load(ours)
+    other = df.copy()
+    other.loc[5, "Cost"] += 1000
+    reloaded = AppointmentIndex(other)
+    store.note_load(reloaded)
+
+    got = store.sync(reloaded)
+    pd.testing.assert_frame_equal(canonical(got), canonical(monthly_aggregates(other)), check_dtype=False)
+
+
+def test_same_index_is_not_recomputed():
+    store = CohortStore()
+    index = AppointmentIndex(appointments())
+    assert store.sync(index) is store.sync(index)
+
+
+def test_cohort_matrices_offsets_are_contiguous():
+    monthly = pd.DataFrame({
+        "identifier": ["a", "a", "b", "c"],
+        "month": [24288, 24291, 24288, 24289],
+        "spend": [100.0, 50.0, 80.0, 20.0],
+        "visits": [1, 1, 1, 1],
+    })
+    masters = {"m1": {"tags": ["VIP"]}}
+    out = cohort_matrices(monthly, {"a": "m1"}, masters, tag_filter=["VIP"])
+
+    assert list(out["clients"].columns) == [0, 1, 2, 3]
+    assert out["retention"].iloc[0].tolist() == [100.0, 0.0, 0.0, 100.0]
+    assert out["revenue"].iloc[0, 3] == pytest.approx(50.0)
+
+
+def test_cohort_matrices_mask_future_offsets():
+    monthly = pd.DataFrame({
+        "identifier": ["a", "a", "b"],
+        "month": [24288, 24289, 24289],
+        "spend": [10.0, 10.0, 10.0],
+        "visits": [1, 1, 1],
+    })
+    clients = cohort_matrices(monthly, {}, {})["clients"]
+    # The later cohort has no offset 1 yet
+    assert np.isnan(clients.iloc[1, 1])
@@ -0,0 +1,65 @@
+import pandas as pd
+
+from client_matching import MIN_CONFIDENCE, soundex, suggest_merges
+
+
+def rows(*clients):
+    return pd.DataFrame(clients, columns=["identifier", "Customer name", "Email", "Phone"])
+
+
+def pair_set(suggestions):
+    return {frozenset(p) for p in zip(suggestions["identifier_a"], suggestions["identifier_b"])}
+
+
+def test_soundex():
+    assert soundex("robert") == soundex("rupert") == "r163"
+    assert soundex("ashcraft") == "a261"
+
+
+def test_same_phone_and_similar_name():
+    df = rows(
+        ("a", "Jane Smith", None, "(514) 555-0101"),
+        ("b", "Jane Smyth", None, "+1 514 555 0101"),
+        ("c", "Robert King", None, "514 555 9999"),
+    )
+    got = suggest_merges(df, {})
+    assert pair_set(got) == {frozenset({"a", "b"})}
+    assert got["confidence"].iloc[0] >= MIN_CONFIDENCE
+    assert "phone" in got["reason"].iloc[0]
+
+
+def test_same_email_address():
+    df = rows(
+        ("a", "J. Smith", "jane.smith@gmail.com", None),
+        ("b", "Jane Smith", "janesmith+spa@gmail.com", None),
+    )
+    assert pair_set(suggest_merges(df, {})) == {frozenset({"a", "b"})}
+
+
+def test_generic_local_part_at_different_domains_is_not_enough():
+    df = rows(
+        ("a", "Acme Corp", "info@acme.com", None),
+        ("b", "Bob Plumbing", "info@bobsplumbing.ca", None),
+    )
+    assert suggest_merges(df, {}).empty
+
+
+def test_pairs_already_on_one_master_are_left_out():
+    df = rows(
+        ("a", "Jane Smith", None, "5145550101"),
+        ("b", "Jane Smith", None, "5145550101"),
+    )
+    assert suggest_merges(df, {"a": "m1", "b": "m1"}).empty
+    assert len(suggest_merges(df, {"a": "m1", "b": "m2"})) == 1
+
+
+def test_one_row_per_identifier_and_ordering():
+    df = rows(
+        ("a", "Jane Smith", "jane@x.com", "5145550101"),
+        ("a", "Jane Smith", "jane@x.com", "5145550101"),
+        ("b", "Jane Smith", "jane@x.com", "5145550101"),
+        ("c", "Jane Smith", None, None),
+    )
+    got = suggest_merges(df, {})
+    assert got["confidence"].is_monotonic_decreasing
+    assert pair_set(got.head(1)) == {frozenset({"a", "b"})}
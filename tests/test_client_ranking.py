@@ -0,0 +1,37 @@
+import pandas as pd
+import pytest
+
+from client_ranking import filter_clients, page_count, ranking_page
+
+
+@pytest.fixture
+def stats():
+    return pd.DataFrame({
+        'Client Name': ["Ann Lee", "Bob Ray", "annabel", None, "Cid"],
+        'Tags': [["VIP"], [], ["VIP", "New"], None, ["Airbnb"]],
+        'Total Spent': [300.0, 500.0, 100.0, 50.0, 400.0],
+    }, index=["m1", "m2", "m3", "m4", "m5"])
+
+
+def test_search_is_case_insensitive_and_literal(stats):
+    assert list(filter_clients(stats, "ANN").index) == ["m1", "m3"]
+    assert filter_clients(stats, "a.n").empty
+
+
+def test_tags_match_any_selected(stats):
+    assert list(filter_clients(stats, tags=["New", "Airbnb"]).index) == ["m3", "m5"]
+    assert list(filter_clients(stats, "ann", ["VIP"]).index) == ["m1", "m3"]
+
+
+def test_no_match_keeps_columns(stats):
+    ranked = filter_clients(stats, "zzzz", ["VIP"])
+    assert ranked.empty
+    assert list(ranked.columns) == list(stats.columns)
+    assert ranking_page(ranked, 1, 50).empty
+
+
+def test_pages_follow_total_spent(stats):
+    assert page_count(0, 2) == 1
+    assert page_count(len(stats), 2) == 3
+    assert list(ranking_page(stats, 1, 2).index) == ["m2", "m5"]
+    assert list(ranking_page(stats, 3, 2).index) == ["m4"]
@@ -0,0 +1,105 @@
+import datetime as dt
+import io
+
+import pandas as pd
+import pytest
+
+from employee_mpi import (
+    EMPLOYEE_STATS, FACT_COLUMNS, employee_day_fact, employee_fact, employee_leaderboard,
+    match_team_members, read_payroll, stats_by_day,
+)
+
+D1, D2 = dt.date(2024, 3, 1), dt.date(2024, 3, 2)
+
+
+@pytest.mark.parametrize("member, expected", [
+    ("Doe Jane", "Jane Doe"),
+    ("Jane D.", "Jane Doe"),
+    ("Jane Do", "Jane Doe"),
+    ("jane", "Jane Doe"),
+    ("Jane Smith", None),
+    ("Jane S.", None),
+])
+def test_match_team_members(member, expected):
+    assert match_team_members([member], ["Jane Doe", "Bob Ray"]).get(member) == expected
+
+
+def test_first_name_payroll_sheet_matches_full_names():
+    matched = match_team_members(["Angela Martin", "Angela M.", "Bob"], ["Angela", "Bob Ray"])
+    assert matched == {"Angela Martin": "Angela", "Angela M.": "Angela", "Bob": "Bob Ray"}
+    # Ambiguous once another employee fits too
+    assert match_team_members(["Angela M."], ["Angela", "Angela Martin"]) == {}
+
+
+def test_loose_keys_need_a_single_employee():
+    matched = match_team_members(["Bob", "Bob R.", "Bob Ray"], ["Bob Ray", "Bob Roy"])
+    assert matched == {"Bob Ray": "Bob Ray"}
+
+
+def payroll_workbook(sheets):
+    buf = io.BytesIO()
+    with pd.ExcelWriter(buf, engine="openpyxl") as writer:
+        for name, df in sheets.items():
+            df.to_excel(writer, sheet_name=name, startrow=5, index=False)
+    buf.seek(0)
+    return buf
+
+
+def test_read_payroll_parses_serial_dates_and_durations():
+    source = payroll_workbook({
+        "1. Jane Doe": pd.DataFrame({
+            "Start date": [45352, "2024-03-02", None],
+            "Length (hours & minutes)": ["7h 30m", "4h", "8h"],
+        }),
+        "2. Bob Ray": pd.DataFrame({"Start date": ["2024-03-01"], "Total hours": [0]}),
+        "Summary": pd.DataFrame({"Start date": ["2024-03-01"], "Total hours": [99]}),
+    })
+
+    payroll = read_payroll(source)
+
+    assert payroll.to_dict("records") == [
+        {"Employee": "Jane Doe", "Date": D1, "Hours": 7.5},
+        {"Employee": "Jane Doe", "Date": D2, "Hours": 4.0},
+    ]
+
+
+@pytest.fixture
+def fact():
+    payroll = pd.DataFrame({"Employee": ["Jane Doe", "Jane Doe", "Bob Ray"],
+                            "Date": [D1, D2, D1], "Hours": [8.0, 4.0, 5.0]})
+    appointments = pd.DataFrame({
+        "Date": [D1, D1, D2, D2],
+        "Cost": [200.0, 90.0, 100.0, 60.0],
+        "Team member": ["Jane D. & Bob Ray", "Bob", "Jane", "Temp Worker"],
+    })
+    return employee_day_fact(payroll, appointments)
+
+
+def test_employee_day_fact_splits_shared_jobs(fact):
+    rows = {(r["Employee"], r["Date"]): r for r in fact.to_dict("records")}
+
+    assert rows[("Jane Doe", D1)] == {"Date": D1, "Employee": "Jane Doe", "Heures payées": 8.0, "CA ($)": 100.0, "Jobs": 1}
+    assert rows[("Bob Ray", D1)]["CA ($)"] == 190.0
+    assert rows[("Bob Ray", D1)]["Jobs"] == 2
+    # No payroll sheet: kept under their own name so revenue still adds up
+    assert rows[("Temp Worker", D2)]["Heures payées"] == 0.0
+    assert fact["CA ($)"].sum() == 450.0
+
+
+def test_stats_by_day_round_trip(fact):
+    daily = pd.DataFrame([{"Date": d, EMPLOYEE_STATS: rows} for d, rows in stats_by_day(fact).items()])
+    pd.testing.assert_frame_equal(employee_fact(daily), fact[FACT_COLUMNS], check_dtype=False)
+
+
+def test_employee_fact_without_stats():
+    assert employee_fact(pd.DataFrame({"Date": [D1]})).empty
+
+
+def test_leaderboard_mpi(fact):
+    board = employee_leaderboard(fact).set_index("Employee")
+
+    assert board.loc["Jane Doe", "MPI ($/h)"] == round(200 / 12, 2)
+    assert board.loc["Bob Ray", "MPI ($/h)"] == 38.0
+    # Zero paid hours gives 0 rather than a division error
+    assert board.loc["Temp Worker", "MPI ($/h)"] == 0.0
+    assert list(board["MPI ($/h)"]) == sorted(board["MPI ($/h)"], reverse=True)
@@ -0,0 +1,84 @@
+import datetime as dt
+
+import pytest
+
+from load_test import FakeBackend, FakeClient
+from mpi_reports import MISSING_CONSTRAINT_CODE, REPORTS_TABLE, save_reports
+
+
+def week(n, data):
+    monday = dt.date(2024, 1, 1) + dt.timedelta(weeks=n)
+    return monday, monday + dt.timedelta(days=5), data
+
+
+class APIError(Exception):
+    def __init__(self, code):
+        super().__init__(f"error {code}")
+        self.code = code
+
+
+class NoConstraintBackend(FakeBackend):
+    """mpi_reports before the (start_date, end_date) unique constraint exists."""
+
+    def execute(self, q):
+        if q.op == "upsert":
+            with self._lock:
+                self.calls[f"{q.table}.upsert"] += 1
+            raise APIError(MISSING_CONSTRAINT_CODE)
+        return super().execute(q)
+
+
+@pytest.fixture
+def backend():
+    return FakeBackend(latency_ms=0, jitter_ms=0)
+
+
+def stored(backend):
+    return {(r["start_date"], r["report_data"]) for r in backend.tables[REPORTS_TABLE]}
+
+
+def test_duplicate_weeks_keep_the_last(backend):
+    ids = save_reports(FakeClient(backend), [week(0, "a"), week(1, "b"), week(0, "c")])
+
+    assert len(backend.tables[REPORTS_TABLE]) == 2
+    assert stored(backend) == {("2024-01-01", "c"), ("2024-01-08", "b")}
+    # Ids in input order; both mentions of week 0 get the saved row's id
+    assert ids[0] == ids[2] != ids[1]
+    assert backend.calls[f"{REPORTS_TABLE}.upsert"] == 1
+
+
+def test_resaving_a_week_overwrites_it(backend):
+    client = FakeClient(backend)
+    first = save_reports(client, [week(0, "a")])
+    second = save_reports(client, [week(1, "b"), week(0, "new")])
+
+    assert second[1] == first[0]
+    assert stored(backend) == {("2024-01-01", "new"), ("2024-01-08", "b")}
+
+
+def test_missing_constraint_falls_back_to_lookup_then_write():
+    backend = NoConstraintBackend(latency_ms=0, jitter_ms=0)
+    client = FakeClient(backend)
+    first = save_reports(client, [week(0, "a")])
+    fallbacks = []
+
+    ids = save_reports(client, [week(0, "x"), week(1, "b"), week(0, "y")], on_fallback=lambda: fallbacks.append(1))
+
+    assert fallbacks == [1]
+    assert ids[0] == ids[2] == first[0]
+    assert ids[1] not in (None, first[0])
+    assert stored(backend) == {("2024-01-01", "y"), ("2024-01-08", "b")}
+
+
+def test_other_errors_are_raised():
+    class Broken(FakeBackend):
+        def execute(self, q):
+            raise APIError("23505")
+
+    with pytest.raises(APIError):
+        save_reports(FakeClient(Broken(0, 0)), [week(0, "a")])
+
+
+def test_nothing_to_save(backend):
+    assert save_reports(FakeClient(backend), []) == []
+    assert not backend.calls
@@ -0,0 +1,60 @@
+import os
+
+from report_cache import ReportCache
+
+
+def test_hit_only_on_matching_version():
+    cache = ReportCache()
+    cache.put("r1", "v1", {"rows": 1})
+
+    assert cache.get("r1", "v1") == {"rows": 1}
+    assert cache.get("r1", "v2") is None
+    # A version mismatch evicts the stale entry
+    assert cache.get("r1", "v1") is None
+
+
+def test_no_version_never_caches():
+    cache = ReportCache()
+    cache.put("r1", None, "value")
+    assert cache.get("r1", None) is None
+
+
+def test_lru_evicts_least_recently_used():
+    cache = ReportCache(max_items=2)
+    cache.put("a", 1, "A")
+    cache.put("b", 1, "B")
+    cache.get("a", 1)
+    cache.put("c", 1, "C")
+
+    assert cache.get("a", 1) == "A"
+    assert cache.get("b", 1) is None
+    assert cache.get("c", 1) == "C"
+
+
+def test_disk_tier_survives_a_new_instance(tmp_path):
+    ReportCache(disk_dir=str(tmp_path)).put("r1", "v1", [1, 2, 3])
+
+    fresh = ReportCache(disk_dir=str(tmp_path))
+    assert fresh.get("r1", "v1") == [1, 2, 3]
+    assert fresh.get("r1", "v2") is None
+    # The stale file was removed
+    assert os.listdir(tmp_path) == []
+
+
+def test_invalidate_clears_both_tiers(tmp_path):
+    cache = ReportCache(disk_dir=str(tmp_path))
+    cache.put("r1", "v1", "value")
+    cache.invalidate("r1")
+
+    assert cache.get("r1", "v1") is None
+    assert ReportCache(disk_dir=str(tmp_path)).get("r1", "v1") is None
+
+
+def test_corrupt_disk_entry_is_a_miss(tmp_path):
+    cache = ReportCache(disk_dir=str(tmp_path))
+    cache.put("r1", "v1", "value")
+    (path,) = [os.path.join(tmp_path, n) for n in os.listdir(tmp_path)]
+    with open(path, "wb") as f:
+        f.write(b"not a pickle")
+
+    assert ReportCache(disk_dir=str(tmp_path)).get("r1", "v1") is None